@@ -0,0 +1,185 @@
+"""Benchmarks the blocking queues in harrison_functions.collections.linked_list
+
+| Moves items from producer threads to consumer threads and reports items per second
+| queue.Queue and collections.deque are the baselines, deque consumers poll since it can't block
+
+.. code-block:: bash
+
+    python benchmarks/bench_queues.py --items 1000000 --producers 2 --consumers 2 --output queues.json
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import platform
+import argparse
+import threading
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from harrison_functions.collections.linked_list import BlockingQueue, BlockingDeque
+
+
+# Functions
+# # run_pipeline
+# # run_benchmark
+# # main
+
+
+_STOP = object()
+
+
+def _single(make_queue):
+    """Producers put one item at a time, consumers get one at a time"""
+    def produce(q, items):
+        for item in items:
+            q.put(item)
+
+    def consume(q, batch_size):
+        count = 0
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return count
+            count += 1
+
+    return make_queue, produce, consume
+
+
+def _batched(make_queue):
+    """put_many and get_many, one lock acquisition per batch"""
+    def produce(q, items):
+        q.put_many(items)
+
+    def consume(q, batch_size):
+        count = 0
+        while True:
+            batch = q.get_many(batch_size)
+            if batch[-1] is _STOP:
+                stops = sum(1 for item in batch if item is _STOP)
+                for _ in range(stops - 1):
+                    q.put(_STOP)  # hand the extra stops to the other consumers
+                return count + len(batch) - stops
+            count += len(batch)
+
+    return make_queue, produce, consume
+
+
+def _polling_deque():
+    """collections.deque is thread-safe for append and popleft but can't block, consumers poll"""
+    def produce(q, items):
+        for item in items:
+            q.append(item)
+
+    def consume(q, batch_size):
+        count = 0
+        while True:
+            try:
+                item = q.popleft()
+            except IndexError:
+                time.sleep(0)
+                continue
+            if item is _STOP:
+                return count
+            count += 1
+
+    return deque, produce, consume
+
+
+def _put_stop(q):
+    if isinstance(q, deque):
+        q.append(_STOP)
+    else:
+        q.put(_STOP)
+
+
+# name: (make_queue(maxsize), produce, consume)
+QUEUES = {
+    'queue.Queue': _single(queue.Queue),
+    'collections.deque': _polling_deque(),
+    'BlockingQueue': _single(BlockingQueue),
+    'BlockingQueue.batched': _batched(BlockingQueue),
+    'BlockingDeque': _single(BlockingDeque),
+    'BlockingDeque.batched': _batched(BlockingDeque),
+}
+
+
+def run_pipeline(name, num_items, producers, consumers, maxsize, batch_size):
+    """Returns the seconds taken to move num_items through the queue, and checks none were lost"""
+    make_queue, produce, consume = QUEUES[name]
+    q = make_queue() if name == 'collections.deque' else make_queue(maxsize)
+
+    counts = []
+    consumer_threads = [threading.Thread(target=lambda: counts.append(consume(q, batch_size)))
+                        for _ in range(consumers)]
+    producer_threads = [threading.Thread(target=produce, args=(q, range(i, num_items, producers)))
+                        for i in range(producers)]
+
+    start = time.perf_counter()
+    for thread in consumer_threads + producer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    for _ in range(consumers):
+        _put_stop(q)
+    for thread in consumer_threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    if sum(counts) != num_items:
+        raise RuntimeError(f'{name} delivered {sum(counts)} of {num_items} items')
+
+    return seconds
+
+
+def run_benchmark(names, num_items, producers, consumers, maxsize, batch_size, repeat=3):
+    results = []
+    for name in names:
+        seconds = min(run_pipeline(name, num_items, producers, consumers, maxsize, batch_size)
+                      for _ in range(repeat))
+        results.append({
+            'queue': name,
+            'items': num_items,
+            'producers': producers,
+            'consumers': consumers,
+            'maxsize': maxsize,
+            'batch_size': batch_size,
+            'time': seconds,
+            'items_per_second': num_items / seconds,
+        })
+        print(f'{name:>24} {seconds:>9.4f}s {num_items / seconds:>14,.0f} items/s', file=sys.stderr)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queues', nargs='+', default=list(QUEUES), choices=list(QUEUES))
+    parser.add_argument('--items', type=int, default=10**5)
+    parser.add_argument('--producers', type=int, default=2)
+    parser.add_argument('--consumers', type=int, default=2)
+    parser.add_argument('--maxsize', type=int, default=1000, help='bound for the blocking queues, deque is unbounded')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this json file')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.queues, args.items, args.producers, args.consumers,
+                            args.maxsize, args.batch_size, args.repeat)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'meta': {'python': platform.python_version(),
+                                'platform': platform.platform(),
+                                'cpus': os.cpu_count(),
+                                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+                       'results': results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
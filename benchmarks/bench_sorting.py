@@ -0,0 +1,250 @@
+"""Benchmarks every sorter in harrison_functions.algos.sorting
+
+| Run all workloads up to 10^5 and save the results:
+
+.. code-block:: bash
+
+    python benchmarks/bench_sorting.py --max-size 100000 --output benchmarks/results/latest.json
+
+| Compare against a stored baseline, exits with 1 if anything regressed:
+
+.. code-block:: bash
+
+    python benchmarks/bench_sorting.py --output latest.json --compare baseline.json --threshold 0.25
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from harrison_functions.algos import sorting
+from harrison_functions.algos.instrumentation import instrument
+
+
+# Functions
+# # make_workload
+# # run_benchmark
+# # compare_results
+# # best_by_workload
+# # main
+
+
+WORKLOADS = ['random', 'sorted', 'reversed', 'many_duplicates', 'near_sorted', 'skewed_floats']
+
+# name: (sorter, largest size worth running, accepts floats, largest size to count operations on,
+#        largest size to trace memory on)
+# instrumentation costs ~60x, so counts are capped lower for slow sorters, None means not a comparison sort
+# tracemalloc costs ~20-30x on the quadratic sorters' inner loops, None means no cap
+ALGORITHMS = {
+    'bubble': (sorting.bubble_sort, 10**4, True, 10**3, 10**3),
+    'selection': (sorting.selection_sort, 10**4, True, 10**3, 10**3),
+    'insertion': (sorting.insertion_sort, 10**4, True, 10**3, 10**3),
+    'counting': (sorting.counting_sort, 10**6, False, None, None),
+    'tree': (sorting.tree_sort, 10**5, True, 10**4, None),
+    'merge': (sorting.merge_sort, 10**5, True, 10**4, None),
+    'bottom_up_merge': (sorting.bottom_up_merge_sort, 10**6, True, 10**4, None),
+    'radix': (sorting.radix_sort, 10**6, False, None, None),
+    'quick': (lambda array: sorting.quick_sort(array, pivot='random'), 10**6, True, 10**4, None),
+    'intro': (sorting.introsort, 10**6, True, 10**4, None),
+    'heap': (sorting.heap_sort, 10**6, True, 10**4, None),
+    'numpy_counting': (sorting.np_counting_sort, 10**7, False, None, None),
+    'numpy_radix': (sorting.np_radix_sort, 10**7, False, None, None),
+    'numpy_merge': (sorting.np_merge_sort, 10**7, True, None, None),
+    'numpy': (sorting.np_sort, 10**7, True, None, None),
+    'auto': (sorting.sort, 10**7, True, None, None),
+}
+
+
+def make_workload(name, size, seed=0):
+    """
+    | Returns a reproducible list for the workload
+    | Integers are non-negative so radix_sort and counting_sort can run on them
+    """
+    rng = random.Random(f'{name}-{size}-{seed}')
+
+    if name == 'random':
+        return [rng.randrange(size * 10) for _ in range(size)]
+    elif name == 'sorted':
+        return sorted(rng.randrange(size * 10) for _ in range(size))
+    elif name == 'reversed':
+        return sorted((rng.randrange(size * 10) for _ in range(size)), reverse=True)
+    elif name == 'many_duplicates':
+        return [rng.randrange(16) for _ in range(size)]
+    elif name == 'near_sorted':
+        array = list(range(size))
+        for _ in range(max(1, size // 100)):  # swap 1% of the items
+            i, j = rng.randrange(size), rng.randrange(size)
+            array[i], array[j] = array[j], array[i]
+        return array
+    elif name == 'skewed_floats':
+        return [rng.lognormvariate(0, 2) for _ in range(size)]
+    else:
+        raise ValueError(f"Please check your input: workload='{name}'")
+
+
+def _is_sorted(array):
+    return all(array[i] <= array[i + 1] for i in range(len(array) - 1))
+
+
+def _count_operations(sorter, array):
+    """Runs the comparison sort under instrumentation and returns (comparisons, writes)"""
+    result, stats = instrument(sorter, array[:])
+    return stats.comparisons, stats.writes
+
+
+def run_benchmark(algorithms, workloads, sizes, repeat=3):
+    """
+    | Times each algorithm on each workload and size
+    | Time is the best of repeat runs, peak memory comes from one tracemalloc run, up to each algorithm's trace limit
+    | Comparisons and writes are counted on a separate run, up to each algorithm's count limit
+    """
+    results = []
+    for workload in workloads:
+        for size in sizes:
+            data = make_workload(workload, size)
+            is_float = isinstance(data[0], float)
+
+            for name in algorithms:
+                sorter, max_size, accepts_floats, count_limit, trace_limit = ALGORITHMS[name]
+                if size > max_size or (is_float and not accepts_floats):
+                    continue
+                use_numpy = name.startswith('numpy')
+
+                timings = []
+                for _ in range(repeat):
+                    array = np.array(data) if use_numpy else data[:]
+                    start = time.perf_counter()
+                    output = sorter(array)
+                    timings.append(time.perf_counter() - start)
+
+                peak_memory = None
+                if trace_limit is None or size <= trace_limit:
+                    array = np.array(data) if use_numpy else data[:]
+                    tracemalloc.start()
+                    sorter(array)
+                    peak_memory = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                comparisons, writes = None, None
+                if count_limit is not None and size <= count_limit:
+                    comparisons, writes = _count_operations(sorter, data)
+
+                results.append({
+                    'algorithm': name,
+                    'workload': workload,
+                    'size': size,
+                    'time': min(timings),
+                    'peak_memory': peak_memory,
+                    'comparisons': comparisons,
+                    'writes': writes,
+                    'correct': len(output) == size and _is_sorted(output),
+                })
+                print(f"{workload:>16} {size:>9} {name:>16} {min(timings):>10.4f}s", file=sys.stderr)
+
+    return results
+
+
+def compare_results(results, baseline, threshold=0.25, min_time=1e-3):
+    """
+    | Returns the rows that got slower or used more memory than the baseline by more than threshold
+    | Timings under min_time are too noisy to compare
+    """
+    baseline_rows = {(row['algorithm'], row['workload'], row['size']): row for row in baseline}
+
+    regressions = []
+    for row in results:
+        base = baseline_rows.get((row['algorithm'], row['workload'], row['size']))
+        if base is None:
+            continue
+
+        for metric in ['time', 'peak_memory']:
+            if metric == 'time' and base['time'] < min_time:
+                continue
+            if row[metric] is None or base[metric] is None:
+                continue
+            if row[metric] > base[metric] * (1 + threshold):
+                regressions.append({
+                    'algorithm': row['algorithm'],
+                    'workload': row['workload'],
+                    'size': row['size'],
+                    'metric': metric,
+                    'baseline': base[metric],
+                    'current': row[metric],
+                    'ratio': row[metric] / base[metric] if base[metric] else math.inf,
+                })
+
+    return regressions
+
+
+def best_by_workload(results):
+    """Returns the fastest correct algorithm for each workload and size"""
+    best = {}
+    for row in results:
+        if not row['correct']:
+            continue
+        key = (row['workload'], row['size'])
+        if key not in best or row['time'] < best[key]['time']:
+            best[key] = row
+    return {f'{workload}/{size}': row['algorithm'] for (workload, size), row in sorted(best.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument('--workloads', nargs='+', default=WORKLOADS, choices=WORKLOADS)
+    parser.add_argument('--min-size', type=int, default=10**2)
+    parser.add_argument('--max-size', type=int, default=10**5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this json file')
+    parser.add_argument('--compare', help='baseline json file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    sizes = [10**exp for exp in range(int(math.log10(args.min_size)), int(math.log10(args.max_size)) + 1)]
+    results = run_benchmark(args.algorithms, args.workloads, sizes, args.repeat)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+        'best': best_by_workload(results),
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for key, algorithm in report['best'].items():
+        print(f'{key:>30}  {algorithm}')
+
+    incorrect = [row for row in results if not row['correct']]
+    for row in incorrect:
+        print(f"INCORRECT: {row['algorithm']} on {row['workload']}/{row['size']}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_results(results, baseline, args.threshold)
+        for row in regressions:
+            print(f"REGRESSION: {row['algorithm']} on {row['workload']}/{row['size']} "
+                  f"{row['metric']} {row['baseline']:.4g} -> {row['current']:.4g} ({row['ratio']:.2f}x)")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Opt-in instrumentation for the sorters in algos.sorting
+
+| Nothing here touches the sorters' loops, so there is no overhead unless it is switched on
+| Comparisons are counted by wrapping each item in a CountedItem
+| Writes are counted by running the sorter on a CountingList
+| Recursion depth and per-function timings come from a sys.setprofile hook
+"""
+
+import sys
+import time
+from collections import defaultdict
+import numpy as np
+
+# Functions
+# # instrument
+# # trace
+
+# Objects
+# # SortStats
+# # CountedItem
+# # CountingList
+# # ProfileHook
+
+
+class SortStats:
+    """
+    | Counters for one instrumented run
+
+    #. comparisons, number of <, <=, >, >=, == between items
+    #. writes, number of items written into the array, a swap counts as two
+    #. max_depth, deepest nesting of Python calls under the sorter, 1 for a loop
+    #. calls, number of calls per function
+    #. phase_times, seconds spent in each function, excluding the functions it calls
+    #. total_time, wall time of the whole run
+    """
+
+    def __init__(self):
+        self.comparisons = 0
+        self.writes = 0
+        self.max_depth = 0
+        self.calls = defaultdict(int)
+        self.phase_times = defaultdict(float)
+        self.total_time = 0.0
+
+    def to_dict(self):
+        return {'comparisons': self.comparisons,
+                'writes': self.writes,
+                'max_depth': self.max_depth,
+                'calls': dict(self.calls),
+                'phase_times': dict(self.phase_times),
+                'total_time': self.total_time}
+
+    def __repr__(self):
+        phases = ', '.join(f'{name}={seconds:.4f}s'
+                           for name, seconds in sorted(self.phase_times.items(), key=lambda x: -x[1]))
+        return (f'SortStats(comparisons={self.comparisons}, writes={self.writes}, '
+                f'max_depth={self.max_depth}, total_time={self.total_time:.4f}s, phases: {phases})')
+
+
+class CountedItem:
+    """Wraps an item and counts every comparison made against it"""
+
+    __slots__ = ('item', 'stats')
+
+    def __init__(self, item, stats):
+        self.item = item
+        self.stats = stats
+
+    def __lt__(self, other):
+        self.stats.comparisons += 1
+        return self.item < other.item
+
+    def __le__(self, other):
+        self.stats.comparisons += 1
+        return self.item <= other.item
+
+    def __gt__(self, other):
+        self.stats.comparisons += 1
+        return self.item > other.item
+
+    def __ge__(self, other):
+        self.stats.comparisons += 1
+        return self.item >= other.item
+
+    def __eq__(self, other):
+        self.stats.comparisons += 1
+        return self.item == other.item
+
+    def __hash__(self):
+        return hash(self.item)
+
+    def __repr__(self):
+        return repr(self.item)
+
+
+class CountingList(list):
+    """
+    | List that counts every item written into it
+    | Slices are CountingLists too, so writes into sub-arrays are counted
+    """
+
+    __slots__ = ('stats',)
+
+    def __init__(self, iterable=(), stats=None):
+        super().__init__(iterable)
+        self.stats = stats
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            self.stats.writes += len(range(*idx.indices(len(self))))
+        else:
+            self.stats.writes += 1
+        super().__setitem__(idx, value)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return CountingList(super().__getitem__(idx), self.stats)
+        return super().__getitem__(idx)
+
+
+class ProfileHook:
+    """
+    | sys.setprofile hook that records call depth, call counts and self time
+    | Only frames outside this file are counted, so CountedItem doesn't show up
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.stack = []
+        self.last_time = None
+
+    def __call__(self, frame, event, arg):
+        if event not in ('call', 'return'):
+            return None
+        code = frame.f_code
+        if code.co_filename == __file__:
+            return None
+
+        now = time.perf_counter()
+        if self.stack:
+            self.stats.phase_times[self.stack[-1]] += now - self.last_time
+        self.last_time = now
+
+        if event == 'call':
+            self.stack.append(code.co_name)
+            self.stats.calls[code.co_name] += 1
+            self.stats.max_depth = max(self.stats.max_depth, len(self.stack))
+        elif self.stack:
+            self.stack.pop()
+
+    def __enter__(self):
+        self.previous = sys.getprofile()
+        sys.setprofile(self)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(self.previous)
+
+
+def instrument(func, array, *args, count_comparisons=True, **kwargs):
+    """
+    | Runs func(array, *args, **kwargs) with instrumentation switched on
+    | Returns the sorted output and a SortStats
+    | Lists are sorted in-place like func would, NumPy arrays are only timed and profiled
+
+    | Set count_comparisons=False for sorters that do arithmetic on the items,
+    | eg. counting_sort and radix_sort
+
+    .. code-block:: python
+
+        >>> result, stats = instrument(quick_sort, [6, 2, 4, 5, 1, 3], pivot='introsort')
+        >>> stats.comparisons, stats.writes, stats.max_depth
+
+    """
+    stats = SortStats()
+
+    if isinstance(array, np.ndarray):
+        wrapped = array
+    elif count_comparisons:
+        wrapped = CountingList((CountedItem(item, stats) for item in array), stats)
+    else:
+        wrapped = CountingList(array, stats)
+
+    start = time.perf_counter()
+    with ProfileHook(stats):
+        result = func(wrapped, *args, **kwargs)
+    stats.total_time = time.perf_counter() - start
+
+    if isinstance(array, np.ndarray):
+        return result, stats
+
+    in_place = result is wrapped
+    if count_comparisons:
+        result = [item.item for item in result]
+    else:
+        result = list(result)
+
+    if in_place and isinstance(array, list):
+        array[:] = result  # keep the sorter's in-place behaviour
+        result = array
+
+    return result, stats
+
+
+def trace(func, array, *args, count_comparisons=True, **kwargs):
+    """
+    | Runs instrument and prints the SortStats, returns the sorted output
+    | This is what to_print=True does in the sorters
+    """
+    result, stats = instrument(func, array, *args, count_comparisons=count_comparisons, **kwargs)
+    print(f'{func.__name__}: {stats}')
+    return result
@@ -1,47 +1,56 @@
+import os
+import sys
+import gzip
+import heapq
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
 from copy import deepcopy
-from collections import defaultdict, deque
+from array import array as int_array
+from bisect import bisect_right
+from collections import deque
 import random
-from harrison_functions.collections.trees import binary_tree_from_array, bucketer
-from harrison_functions.utils.std.digit import get_digit, digits_num_to_tuple, digits_tuple_to_num
+import numpy as np
+from harrison_functions.collections.trees import AVLTree, IntervalIndex, bucketer
+from harrison_functions.collections.custom_errors import MethodNotFoundError
+from harrison_functions.algos.instrumentation import CountingList, trace
+from harrison_functions.utils.std.digit import digits_num_to_tuple, digits_tuple_to_num
 
 
 # Functions
-# # idx_hash_table_for_array
-# # map_hash
 # # bubble_sort
 # # selection_sort
 # # insertion_sort
 # # counting_sort
 # # tree_sort
 # # merge_sort
+# # bottom_up_merge_sort
 # # bucket_sort
 # # radix_sort_v0
 # # radix_sort
 # # qs_partition
 # # quick_sort
-
-
-def idx_hash_table_for_array(array):
-    """Returns a dictionary with ids as keys and a list of indexes as values.
-    """
-
-    hash_table = {}
-    for original_idx, num in enumerate(array):
-        if hash_table.get(id(num)) is None:
-            hash_table[id(num)] = deque([original_idx])
-        else:
-            hash_table[id(num)].append(original_idx)
-
-    return hash_table
-
-
-def map_hash(array, hash_table):
-    """
-    | Returns original positions of a sorted array
-    | Use in conjunction with idx_hash_table_for_array
-    """
-    temp_hash_table = deepcopy(hash_table)  # preserve original copy
-    return [temp_hash_table[id(num)].popleft() for num in array]
+# # introsort
+# # heap_sort
+# # np_counting_sort
+# # np_radix_sort
+# # np_merge_sort
+# # np_sort
+# # sort_path
+# # sort
+# # argsort
+# # take
+# # external_sort
+# # parallel_sort
+# # select_kth
+# # partial_sort
+# # top_k
+
+# Deprecated
+# # idx_hash_table_for_array
+# # map_hash
 
 
 def bubble_sort(array: list, to_print=False):
@@ -70,6 +79,9 @@ def bubble_sort(array: list, to_print=False):
         6, 11, [11, 12, 22, 25, 34, 64, 90]
 
     """
+    if to_print:
+        return trace(bubble_sort, array)
+
     array_len = len(array)
 
     for loop_idx in range(array_len):
@@ -83,8 +95,6 @@ def bubble_sort(array: list, to_print=False):
 
             prev_num = curr_num
 
-        print(loop_idx, prev_num, array) if to_print else None
-
     return array
 
 
@@ -112,19 +122,19 @@ def selection_sort(array: list, to_print=False):
         6, 90, [11, 12, 22, 25, 34, 64, 90]
 
     """
+    if to_print:
+        return trace(selection_sort, array)
+
     array_len = len(array)
 
     for loop_idx in range(array_len):
 
-        min_idx, prev_num = loop_idx, array[loop_idx]
+        min_idx, min_num = loop_idx, array[loop_idx]
         for i, curr_num in enumerate(array[1 + loop_idx:], 1 + loop_idx):
 
-            if curr_num < prev_num:
-                min_idx = i
+            if curr_num < min_num:
+                min_idx, min_num = i, curr_num
 
-            prev_num = curr_num
-
-        print(loop_idx, array[min_idx], array) if to_print else None
         array[loop_idx], array[min_idx] = array[min_idx], array[loop_idx]
 
     return array
@@ -160,6 +170,9 @@ def insertion_sort(array: list, to_print=False):
     | Move the next element to the appropriate position in the sorted part.
 
     """
+    if to_print:
+        return trace(insertion_sort, array)
+
     array_len = len(array)
 
     for loop_idx in range(1, array_len):
@@ -168,7 +181,6 @@ def insertion_sort(array: list, to_print=False):
 
         for i, curr_num in enumerate(array[0:loop_idx]):
 
-            print(loop_idx, insert_num, curr_num, array) if to_print else None
             if insert_num < curr_num:
                 array[i], insert_num = insert_num, curr_num
 
@@ -177,42 +189,56 @@ def insertion_sort(array: list, to_print=False):
     return array
 
 
-def counting_sort(array: list):
+def counting_sort(array: list, key=None):
     """
-    | Can only use if range and spacing is known 
-    | Build a dictionary with num as keys and count as values
-    | Iterate through the known range, retrieving counts from the dictionary
-    | Use deque because append operation is O(1)
-    | This doesn't preserve the original items
-    
-    | Runtime is O(n+range)
+    | Sorts without comparing items, picks a strategy based on how dense the values are
+
+    #. | Dense, the range is at most a few times the length
+       | Count with np.bincount and expand with np.repeat, O(n + range)
+    #. | Sparse, eg. [0, 10**9]
+       | Count with a dictionary, then walk the sorted unique keys, O(n + k log k) for k unique keys
+
+    | This doesn't preserve the original items, equal numbers come back as one object
+    | Only plain ints take the dense path, bools and floats keep their type through the dictionary
+
+    | Key/value mode: pass key to stably sort records by an integer key,
+    | eg. group rows by small category codes in linear time
+
+    .. code-block:: python
+
+        >>> counting_sort([3, 1, 2, 1])
+        [1, 1, 2, 3]
+        >>> counting_sort([('b', 2), ('a', 1), ('c', 2)], key=lambda row: row[1])
+        [('a', 1), ('b', 2), ('c', 2)]
     """
+    if len(array) == 0:
+        return []
+
+    if key is not None:
+        return [array[idx] for idx in _counting_argsort([key(item) for item in array])]
 
-    # these would normally be arguments
     array_min, array_max = min(array), max(array)
+    is_int = set(map(type, array)) == {int}  # np.repeat would turn bools into ints
+
+    if is_int and _is_dense(array_min, array_max, len(array)) and -2**63 <= array_min and array_max < 2**63:
+        counts = np.bincount(np.asarray(array, dtype=np.int64) - array_min)
+        return np.repeat(np.arange(array_min, array_min + counts.size, dtype=np.int64), counts).tolist()
 
-    # this can also be implemented as
-    # counter = Counter(array)
-    counter = defaultdict(dict)
+    counter = {}
     for num in array:
-        if counter.get(num) is None:
-            counter[num] = 1
-        else:
-            counter[num] += 1
+        counter[num] = counter.get(num, 0) + 1
 
-    new_array = deque([])
-    for num in range(array_min, array_max + 1):
-        count = counter.get(num)
-        if count is not None:
-            for iterations in range(count):
-                new_array.append(num)
+    new_array = []
+    for num in sorted(counter):
+        new_array.extend([num] * counter[num])
 
-    return list(new_array)
+    return new_array
 
 
 def tree_sort(array):
     """
-    | Sort by insertion into binary tree
+    | Sort by insertion into a self-balancing AVLTree
+    | O(n log n) even on sorted input, duplicates are kept
     
     #. Example
 
@@ -222,17 +248,18 @@ def tree_sort(array):
         [1, 3, 4, 5, 10]
     """
 
-    tree = binary_tree_from_array(array)
-    for i, node in enumerate(tree.recursive_inorder()):
-        array[i] = node.data
+    tree = AVLTree(array)
+    for i, item in enumerate(tree):
+        array[i] = item
 
     return array
 
 
-def merge_sort(array, to_print=False):
+def merge_sort(array, to_print=False, method='recursive'):
     """
     | Recursively calls itself to split
     | Then reconstructs a new sorted array during the merging process
+    | Use method='bottom_up' for large inputs, see bottom_up_merge_sort
     
     #. Example
 
@@ -244,15 +271,22 @@ def merge_sort(array, to_print=False):
     
            [5, 6, 7, 11, 12, 13]
 
-    | Should look up iterative implementation
+    | For an iterative version without recursion, use method='bottom_up'
     | See: https://stackoverflow.com/questions/18761766/mergesort-with-python
     """
+    if to_print:
+        return trace(merge_sort, array, method=method)
+
+    if method == 'bottom_up':
+        return bottom_up_merge_sort(array)
+    elif method != 'recursive':
+        raise MethodNotFoundError(f"Please check your input: method='{method}'")
+
     if len(array) > 1:
 
         # split
         mid = len(array) // 2
         left, right = array[:mid], array[mid:]
-        print("split: ", array, left, right) if to_print else None
 
         # recursive call
         left = merge_sort(left)
@@ -268,7 +302,6 @@ def merge_sort(array, to_print=False):
             i += 1
 
         # copy missed elements
-        print("remain: ", i, left, right) if to_print else None
         if left:
             for num in left:
                 array[i] = num
@@ -278,14 +311,130 @@ def merge_sort(array, to_print=False):
                 array[i] = num
                 i += 1
 
-    print("merge: ", array) if to_print else None
     return array
 
 
-def bucket_sort(array, intervals, sorter=bubble_sort, to_print=False):
+def bottom_up_merge_sort(array, min_run=32):
+    """
+    | Iterative natural merge sort, sorts in-place and is stable
+    | No recursion and a single auxiliary buffer of size n
+
+    #. Split the array into natural runs, strictly descending runs are reversed in-place
+    #. Extend runs shorter than min_run with binary insertion sort
+    #. Merge neighbouring runs, alternating between the array and the buffer
+
+    | Already sorted input is a single run, so it costs one O(n) scan
+    | Pairs of runs that are already in order are copied without comparisons
+
+    #. Example
+
+       .. code-block:: python
+
+           >>> bottom_up_merge_sort([1, 2, 3, 9, 8, 7, 4, 5, 6])
+           [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+    | See: https://en.wikipedia.org/wiki/Timsort
+    """
+    array_len = len(array)
+    if array_len < 2:
+        return array
+
+    # find runs
+    bounds = [0]
+    start = 0
+    while start < array_len:
+        stop = start + 1
+        if stop < array_len and array[stop] < array[start]:
+            while stop < array_len and array[stop] < array[stop - 1]:
+                stop += 1
+            _reverse_range(array, start, stop)
+        else:
+            while stop < array_len and not array[stop] < array[stop - 1]:
+                stop += 1
+
+        if stop - start < min_run and stop < array_len:
+            new_stop = min(start + min_run, array_len)
+            _binary_insertion_sort(array, start, stop, new_stop)
+            stop = new_stop
+
+        bounds.append(stop)
+        start = stop
+
+    # merge runs, an instrumented input gets an instrumented buffer so its writes are counted too
+    src, dst = array, [None] * array_len
+    if isinstance(array, CountingList):
+        dst = CountingList(dst, array.stats)
+    while len(bounds) > 2:
+        new_bounds = [0]
+        for i in range(0, len(bounds) - 2, 2):
+            _merge_runs(src, dst, bounds[i], bounds[i + 1], bounds[i + 2])
+            new_bounds.append(bounds[i + 2])
+
+        if len(bounds) % 2 == 0:  # odd number of runs, carry the last one
+            dst[bounds[-2]:] = src[bounds[-2]:]
+            new_bounds.append(array_len)
+
+        src, dst = dst, src
+        bounds = new_bounds
+
+    if src is not array:
+        array[:] = src
+
+    return array
+
+
+def _reverse_range(array, start, stop):
+    """Reverses array[start:stop] in-place"""
+    stop -= 1
+    while start < stop:
+        array[start], array[stop] = array[stop], array[start]
+        start += 1
+        stop -= 1
+
+
+def _binary_insertion_sort(array, start, sorted_stop, stop):
+    """
+    | array[start:sorted_stop] is already sorted
+    | Insert each of array[sorted_stop:stop] at its bisect_right position
+    """
+    for i in range(sorted_stop, stop):
+        insert_num = array[i]
+        pos = bisect_right(array, insert_num, start, i)
+        array[pos + 1:i + 1] = array[pos:i]
+        array[pos] = insert_num
+
+
+def _merge_runs(src, dst, start, mid, stop):
+    """Stable merge of src[start:mid] and src[mid:stop] into dst[start:stop]"""
+
+    if not src[mid] < src[mid - 1]:  # runs are already in order
+        dst[start:stop] = src[start:stop]
+        return None
+
+    i, j, k = start, mid, start
+    while i < mid and j < stop:
+        if src[j] < src[i]:
+            dst[k] = src[j]
+            j += 1
+        else:
+            dst[k] = src[i]
+            i += 1
+        k += 1
+
+    if i < mid:
+        dst[k:stop] = src[i:mid]
+    else:
+        dst[k:stop] = src[j:stop]
+
+
+def bucket_sort(array, intervals, sorter=None, to_print=False, workers=None):
     """
     | Group input array into buckets, sort each bucket, then merge
-    | The bucketer algorithm relies on binary search tree
+    | The bucketer assigns all bucket ids with one np.searchsorted call
+    | sorter is any function that returns the sorted bucket, defaults to sort
+    | Set workers to sort the buckets in a ProcessPoolExecutor
+    | intervals can be an IntervalIndex to reuse it, buckets are merged in order of their starts
+    | Intervals shouldn't overlap, and raises ValueError for values outside every interval
     
     #. Example
 
@@ -303,13 +452,28 @@ def bucket_sort(array, intervals, sorter=bubble_sort, to_print=False):
         [11, 12, 22, 25, 34, 64, 90]
 
     """
+    if to_print:
+        return trace(bucket_sort, array, intervals, sorter=sorter, workers=workers,
+                     count_comparisons=False)
+
+    sorter = sorter or sort
+
+    if not isinstance(intervals, IntervalIndex):
+        intervals = IntervalIndex(intervals)
 
     buckets = bucketer(array, intervals)
-    print(buckets) if to_print else None
+    if sum(len(bucket) for bucket in buckets) != len(array):
+        raise ValueError("Please check your input: some values are outside every interval")
+    buckets = [buckets[idx] for idx in intervals.order.tolist()]  # order sorts the ids by start
 
-    for bucket in buckets:
-        bucket = sorter(bucket)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            buckets = list(executor.map(sorter, buckets))
+    else:
+        buckets = [sorter(bucket) for bucket in buckets]
 
+    if isinstance(array, np.ndarray):
+        return np.concatenate(buckets) if buckets else array[:0]
     return [num for bucket in buckets for num in bucket]  # unpack buckets
 
 
@@ -344,49 +508,37 @@ def radix_sort_v0(array):
 
 def radix_sort(array, to_print=False):
     """
-    | Sort each decimal place, then join
-    | Like bucket_sort, but for each decimal place
-    | Use hashtables to preserve original object
+    | Sorts in-place, stable
+    | Like bucket_sort, but for each byte, with 256 buckets per pass
+
+    #. int, LSD base 256 on num - min, so negatives and big ints are handled
+    #. float, LSD base 256 on the IEEE-754 bits, flipped so they order like the floats
+    #. str or bytes, MSD base 256 on the utf-8 bytes, see _msd_radix_argsort
+
+    | Each pass counts the digits, turns the counts into offsets with a prefix sum,
+    | then scatters the indices into a preallocated buffer
+    | 64-bit keys take at most 8 passes, bytes that are equal for every key are skipped
     
     #. Example
 
        .. code-block:: python
 
-           array = [1, 203, 10, 14]
-           radix_sort(array)
-       
-           {1: deque([1]), 0: deque([10]), 4: deque([14]), 3: deque([203])}
-           [10, 1, 203, 14]
-           {1: deque([10, 14]), 0: deque([1, 203])}
-           [1, 203, 10, 14]
-           {0: deque([1, 10, 14]), 2: deque([203])}
-           [1, 10, 14, 203]
-           {0: deque([1, 10, 14, 203])}
-           [1, 10, 14, 203]
+           >>> radix_sort([1, 203, -10, 14])
+           [-10, 1, 14, 203]
+           >>> radix_sort([2.5, -0.5, 1e-3])
+           [-0.5, 0.001, 2.5]
+           >>> radix_sort(['banana', 'apple', 'app'])
+           ['app', 'apple', 'banana']
 
     """
-    max_num = max(array)
-    num_digits = len(str(max_num))
+    if to_print:
+        return trace(radix_sort, array, count_comparisons=False)
 
-    for digit in range(num_digits + 1):
+    if len(array) < 2:
+        return array
 
-        # bucket_sort each digit
-        hash_table = {}
-        for i, num in enumerate(array):
-            digit_val = get_digit(num, digit)
-            if hash_table.get(digit_val) is None:
-                hash_table[digit_val] = deque([num])
-            else:
-                hash_table[digit_val].append(num)
-        print(hash_table) if to_print else None
-
-        # merge each bucket back into original array
-        i = 0
-        for digit in range(0, 10):
-            while hash_table.get(digit):
-                array[i] = hash_table[digit].popleft()
-                i += 1
-        print(array) if to_print else None
+    order = _radix_order(array)
+    array[:] = [array[idx] for idx in order]
 
     return array
 
@@ -397,6 +549,7 @@ def qs_partition(array, start, stop, pivot='last', to_print=False):
     | Iterate through the array, Eg. [6, 2, 4, 5, 1, 3]
     | If the element is smaller than the pivot:
     | swap with the pivot_num, then increment the pivot_idx
+    | Set to_print=True to print the range before and after partitioning
     
     
     #. pivot='last'
@@ -454,30 +607,25 @@ def qs_partition(array, start, stop, pivot='last', to_print=False):
             now quicksort [2, 4, 1, 3]
    
     """
-    pivot_options = {'first': start,
-                     'last': stop,
-                     'random': random.randrange(start, stop)}  # try some other pivots
-
-    pivot_pos = pivot_options[pivot]
+    if pivot == 'first':
+        pivot_pos = start
+    elif pivot == 'last':
+        pivot_pos = stop
+    elif pivot == 'random':
+        pivot_pos = random.randrange(start, stop)
+    else:
+        raise MethodNotFoundError(f"Please check your input: pivot='{pivot}'")
     pivot_num = array[pivot_pos]
 
     pivot_idx = start
-    print("before:", array[start:stop + 1],
-          'pivot_pos=', pivot_pos,
-          "pivot_num=", pivot_num
-          ) if to_print else None
+    if to_print:
+        print("before:", array[start:stop + 1], 'pivot_pos=', pivot_pos, "pivot_num=", pivot_num)
 
-    for i, num in enumerate(array[start: stop + 1], start):
+    for i in range(start, stop + 1):
+        num = array[i]
 
         # skip the pivot
-        if i == pivot_pos:
-            print(i, 'do nothing,', array, "pivot_pos=", pivot_pos) if to_print else None
-            pass
-
-        elif num <= pivot_num:
-            print(i, f"swap {array[i]} and {array[pivot_idx]},", array,
-                  "pivot_pos=", pivot_pos
-                  ) if to_print else None
+        if i != pivot_pos and num <= pivot_num:
             array[i], array[pivot_idx] = array[pivot_idx], array[i]
 
             # update pivot_pos if it was swapped
@@ -486,21 +634,12 @@ def qs_partition(array, start, stop, pivot='last', to_print=False):
 
             pivot_idx += 1
 
-        else:
-            print(i, 'do nothing,', array, "pivot_pos=", pivot_pos) if to_print else None
-
     # move the pivot to the pivot_idx
-
     if pivot_idx != pivot_pos:
-        print(f"swap {array[pivot_idx]} and {array[pivot_pos]},", array,
-              "pivot_pos=", pivot_pos
-              ) if to_print else None
         array[pivot_idx], array[pivot_pos] = array[pivot_pos], array[pivot_idx]
 
-    else:
-        print(f"do nothing,", array, "pivot_pos=", pivot_pos) if to_print else None
-
-    print("after:", array[start:stop + 1], "pivot_idx=", pivot_idx) if to_print else None
+    if to_print:
+        print("after:", array[start:stop + 1], "pivot_idx=", pivot_idx)
     return array, pivot_idx
 
 
@@ -509,17 +648,959 @@ def quick_sort(array, start=0, stop=None, pivot='last', to_print=False):
     | Moves the pivot to the pivot_idx
     | Numbers <= pivot are moved to the left of the pivot_idx.
     | Numbers > pivot are moved to the right of the pivot_idx.
-    | Recursively sorts left and right subarrays
+    | Recursively sorts the smaller subarray and loops on the larger one,
+    | so the stack depth stays O(log n)
+
+    | Use pivot='introsort' to avoid O(n^2) on sorted and adversarial inputs, see introsort
     """
+    if to_print:
+        return trace(quick_sort, array, start, stop, pivot)
+
     if len(array) <= 1:
         return array
 
     if stop == None:
         stop = len(array) - 1
 
-    if start < stop:
-        array, pivot_idx = qs_partition(array, start, stop, pivot, to_print)
+    if pivot == 'introsort':
+        return introsort(array, start, stop)
+
+    while start < stop:
+        array, pivot_idx = qs_partition(array, start, stop, pivot)
+
+        if pivot_idx - start < stop - pivot_idx:
+            array = quick_sort(array, start, pivot_idx - 1, pivot)
+            start = pivot_idx + 1
+        else:
+            array = quick_sort(array, pivot_idx + 1, stop, pivot)
+            stop = pivot_idx - 1
+
+    return array
+
+
+def introsort(array, start=0, stop=None, small_size=16):
+    """
+    | Sorts array[start:stop + 1] in-place, no recursion and no list copies
+
+    #. Median-of-three pivot, then Hoare partition in-place
+    #. Partitions with small_size items or fewer are insertion sorted
+    #. Once the depth exceeds 2*log2(n), fall back to heap_sort for that partition
+
+    | Worst case is O(n log n), sorted and reversed inputs are O(n log n) partitions
+    | An explicit stack holds the larger partition, so it never exceeds O(log n) items
+
+    #. Example
+
+       .. code-block:: python
+
+           >>> introsort([6, 2, 4, 5, 1, 3])
+           [1, 2, 3, 4, 5, 6]
+
+    | See: https://en.wikipedia.org/wiki/Introsort
+    """
+    if stop is None:
+        stop = len(array) - 1
+
+    max_depth = 2 * (stop - start + 1).bit_length()
+
+    stack = [(start, stop, max_depth)]
+    while stack:
+        lo, hi, depth = stack.pop()
+
+        while lo < hi:
+            if hi - lo < small_size:
+                _insertion_sort_range(array, lo, hi)
+                break
+
+            if depth == 0:
+                heap_sort(array, lo, hi)
+                break
+            depth -= 1
+
+            split = _hoare_partition(array, lo, hi)
+            if split - lo < hi - split:
+                stack.append((split + 1, hi, depth))
+                hi = split
+            else:
+                stack.append((lo, split, depth))
+                lo = split + 1
+
+    return array
+
+
+def heap_sort(array, start=0, stop=None):
+    """
+    | Sorts array[start:stop + 1] in-place with a max heap
+    | O(n log n) worst case, not stable
+
+    #. Heapify bottom-up in O(n)
+    #. Swap the max to the end of the range and sift the new root down
+    """
+    if stop is None:
+        stop = len(array) - 1
+
+    heap_len = stop - start + 1
+    for root in range(heap_len // 2 - 1, -1, -1):
+        _sift_down(array, start, root, heap_len)
+
+    for end in range(heap_len - 1, 0, -1):
+        array[start], array[start + end] = array[start + end], array[start]
+        _sift_down(array, start, 0, end)
 
-        array = quick_sort(array, start, pivot_idx - 1, pivot, to_print)
-        array = quick_sort(array, pivot_idx + 1, stop, pivot, to_print)
     return array
+
+
+def _sift_down(array, offset, root, heap_len):
+    """Sift array[offset + root] down a max heap stored in array[offset:offset + heap_len]"""
+    item = array[offset + root]
+    child = 2 * root + 1
+    while child < heap_len:
+        if child + 1 < heap_len and array[offset + child] < array[offset + child + 1]:
+            child += 1
+        if not item < array[offset + child]:
+            break
+        array[offset + root] = array[offset + child]
+        root = child
+        child = 2 * root + 1
+    array[offset + root] = item
+
+
+def _hoare_partition(array, lo, hi):
+    """
+    | Median-of-three pivot, then Hoare partition of array[lo:hi + 1]
+    | Returns split such that array[lo:split + 1] <= pivot <= array[split + 1:hi + 1]
+    """
+    mid = (lo + hi) // 2
+    if array[mid] < array[lo]:
+        array[mid], array[lo] = array[lo], array[mid]
+    if array[hi] < array[lo]:
+        array[hi], array[lo] = array[lo], array[hi]
+    if array[hi] < array[mid]:
+        array[hi], array[mid] = array[mid], array[hi]
+    pivot_num = array[mid]
+
+    i, j = lo - 1, hi + 1
+    while True:
+        i += 1
+        while array[i] < pivot_num:
+            i += 1
+        j -= 1
+        while pivot_num < array[j]:
+            j -= 1
+        if i >= j:
+            return j
+        array[i], array[j] = array[j], array[i]
+
+
+def _insertion_sort_range(array, lo, hi):
+    """Sorts array[lo:hi + 1] in-place by shifting larger items right"""
+    for i in range(lo + 1, hi + 1):
+        insert_num = array[i]
+        j = i - 1
+        while j >= lo and insert_num < array[j]:
+            array[j + 1] = array[j]
+            j -= 1
+        array[j + 1] = insert_num
+
+
+def np_counting_sort(array):
+    """
+    | Vectorized counting_sort for integer arrays
+
+    #. Dense ranges, np.bincount counts each value offset by the minimum, np.repeat expands the counts
+    #. Sparse ranges, np.unique returns the sorted keys and their counts
+
+    | Runtime is O(n+range) when dense
+    """
+    array = np.asarray(array)
+    if array.size == 0:
+        return array.copy()
+
+    if not _is_dense(int(array.min()), int(array.max()), array.size):
+        values, counts = np.unique(array, return_counts=True)
+        return np.repeat(values, counts)
+
+    # int64 arithmetic wraps consistently, so small ranges are safe for any integer dtype
+    array_min = array.min().astype(np.int64)
+    counts = np.bincount(array.astype(np.int64) - array_min)
+    values = (np.arange(counts.size, dtype=np.int64) + array_min).astype(array.dtype)
+
+    return np.repeat(values, counts)
+
+
+def np_radix_sort(array):
+    """
+    | Vectorized LSD radix sort for integer and float arrays, one byte per pass
+    | Integers are shifted by the minimum into uint64 so negatives are handled
+    | Floats are mapped to uint64 by flipping their IEEE-754 bits, NaNs of either sign go last like np.sort
+    | Only the bytes spanned by (max - min) are visited
+    | Each pass is a stable argsort on a uint8 digit, which numpy runs as a counting sort
+    | The passes build a permutation that gathers the original values, so -0.0 and NaN payloads survive
+
+    #. Example
+
+       .. code-block:: python
+
+           >>> np_radix_sort(np.array([1, 203, -10, 14]))
+           array([-10,   1,  14, 203])
+    """
+    array = np.asarray(array)
+    if array.size == 0:
+        return array.copy()
+
+    dtype = array.dtype
+    sign = np.uint64(1 << 63)
+    if dtype.kind == 'f':
+        keys = (array.astype(np.float64) + 0.0).view(np.uint64)  # + 0.0 turns -0.0 into 0.0
+        keys = np.where(keys & sign, ~keys, keys | sign)
+        keys[np.isnan(array)] = np.iinfo(np.uint64).max
+    elif dtype.kind == 'u':
+        keys = array.astype(np.uint64)
+    else:
+        keys = array.astype(np.int64).view(np.uint64) ^ sign
+
+    keys = keys - keys.min()
+    order = np.arange(array.size)
+
+    num_bytes = (int(keys.max()).bit_length() + 7) // 8
+    for byte in range(num_bytes):
+        digits = ((keys >> np.uint64(8 * byte)) & np.uint64(0xFF)).astype(np.uint8)
+        idx = np.argsort(digits, kind='stable')
+        keys, order = keys[idx], order[idx]
+
+    return array[order]
+
+
+def np_merge_sort(array):
+    """
+    | Vectorized stable sort for any numeric array
+    | Uses np.sort(kind='stable'), which is timsort or radix sort depending on dtype
+    """
+    return np.sort(np.asarray(array), kind='stable')
+
+
+def np_sort(array):
+    """
+    | np.sort with its default introsort, the fastest way to sort numeric values
+    | Stability can't be observed when only values are returned, so sort uses this for numeric data
+    """
+    return np.sort(np.asarray(array))
+
+
+def sort_path(array, algorithm='auto'):
+    """
+    | Returns the name of the implementation that sort would use
+    | NumPy arrays and homogeneous int or float lists go to the vectorized kernels
+    | Everything else falls back to the pure Python sorters
+
+    | auto picks:
+
+    #. numpy for int and float data, plain np.sort
+    #. bottom_up_merge for everything else
+
+    | counting, radix and merge on numeric data go to the matching stable NumPy kernels
+
+    .. code-block:: python
+
+        >>> sort_path([3, 1, 2])
+        'numpy'
+        >>> sort_path([3, 1, 2], 'radix')
+        'numpy_radix'
+        >>> sort_path(['b', 'a'])
+        'bottom_up_merge'
+    """
+    if algorithm not in SORTERS and algorithm != 'auto':
+        raise MethodNotFoundError(f"Please check your input: algorithm='{algorithm}'")
+
+    kind = _numeric_kind(array)
+
+    if kind is None or algorithm not in ('auto', 'counting', 'radix', 'merge'):
+        return 'bottom_up_merge' if algorithm == 'auto' else algorithm
+
+    if algorithm == 'auto':
+        return 'numpy'
+
+    if algorithm == 'counting' and kind == 'f':
+        return 'numpy_merge'
+
+    return f'numpy_{algorithm}'
+
+
+def sort(array, algorithm='auto', return_path=False):
+    """
+    | Front door for all the sorters in this module
+    | NumPy inputs return NumPy arrays, lists and other iterables return lists
+    | Always returns a new object, the input is never modified
+    | Set return_path=True to also return the path chosen by sort_path
+
+    .. code-block:: python
+
+        >>> sort([64, 34, 25, 12, 22, 11, 90], return_path=True)
+        ([11, 12, 22, 25, 34, 64, 90], 'numpy')
+
+    """
+    if not isinstance(array, (list, np.ndarray)):
+        array = list(array)
+
+    path = sort_path(array, algorithm)
+
+    if path.startswith('numpy'):
+        result = NP_SORTERS[path](array)
+        if not isinstance(array, np.ndarray):
+            result = result.tolist()
+
+    elif isinstance(array, np.ndarray):
+        result = np.array(SORTERS[path](array.tolist()), dtype=array.dtype)
+
+    else:
+        result = SORTERS[path](list(array))  # most sorters work in-place
+
+    if return_path:
+        return result, path
+    return result
+
+
+def _numeric_kind(array):
+    """
+    | Returns 'i' for integer and 'f' for float inputs that numpy can sort
+    | Returns None if the input should stay in pure Python
+    """
+    if isinstance(array, np.ndarray):
+        if array.ndim != 1 or array.size == 0:
+            return None
+        if array.dtype.kind in 'iu':
+            return 'i'
+        if array.dtype.kind == 'f':
+            return 'f'
+        return None
+
+    if not isinstance(array, list) or len(array) == 0:
+        return None
+
+    types = set(map(type, array))
+    if types == {int}:
+        if min(array) < -2**63 or max(array) >= 2**63:
+            return None  # would overflow int64
+        return 'i'
+    if types == {float}:
+        return 'f'
+    return None
+
+
+def argsort(array, algorithm='auto'):
+    """
+    | Returns the permutation that stably sorts array, like np.argsort(kind='stable')
+    | Replaces idx_hash_table_for_array and map_hash
+    | NumPy inputs return an ndarray of indices, everything else returns an array('q')
+
+    | Original indices are tracked in a compact integer array, so the memory is
+    | 8 bytes per element and mapping back with take stays O(n)
+
+    | algorithm:
+
+    #. auto, uses numpy for numeric data, otherwise sorts the indices with a key
+    #. counting, prefix-sum scatter of the indices
+    #. radix, LSD or MSD prefix-sum scatters of the indices, see radix_sort
+    #. any comparison sorter in SORTERS, sorts (value, index) pairs so ties stay stable
+
+    .. code-block:: python
+
+        >>> argsort([30, 10, 20, 10])
+        array('q', [1, 3, 2, 0])
+        >>> take([30, 10, 20, 10], argsort([30, 10, 20, 10]))
+        [10, 10, 20, 30]
+    """
+    path = sort_path(array, algorithm)
+
+    if path.startswith('numpy'):
+        order = np.argsort(np.asarray(array), kind='stable')
+        if isinstance(array, np.ndarray):
+            return order
+        return int_array('q', order.astype(np.int64).tobytes())
+
+    if isinstance(array, np.ndarray):
+        array = array.tolist()
+
+    if algorithm == 'auto':
+        return int_array('q', sorted(range(len(array)), key=array.__getitem__))
+
+    if path == 'counting':
+        return _counting_argsort(array)
+
+    if path == 'radix':
+        return _radix_order(array)
+
+    pairs = [(num, idx) for idx, num in enumerate(array)]
+    return int_array('q', [idx for num, idx in SORTERS[path](pairs)])
+
+
+def take(array, order):
+    """
+    | Returns the items of array in the order given by argsort
+
+    .. code-block:: python
+
+        >>> take(['c', 'a', 'b'], [1, 2, 0])
+        ['a', 'b', 'c']
+    """
+    if isinstance(array, np.ndarray):
+        return array[np.asarray(order)]
+    return [array[idx] for idx in order]
+
+
+def _counting_argsort(array):
+    """
+    | Counts each key, turns the counts into starting offsets with a prefix sum,
+    | then scatters each index into its offset in one stable pass
+    | Dense integer keys are counted in a list indexed by key - min, anything else in a dictionary
+    """
+    order = int_array('q', bytes(8 * len(array)))
+    if len(array) == 0:
+        return order
+
+    if set(map(type, array)) <= {int, bool}:
+        array_min, array_max = min(array), max(array)
+        if _is_dense(array_min, array_max, len(array)):
+            offsets = [0] * (array_max - array_min + 1)
+            for num in array:
+                offsets[num - array_min] += 1
+
+            total = 0
+            for i, count in enumerate(offsets):
+                offsets[i], total = total, total + count
+
+            for idx, num in enumerate(array):
+                order[offsets[num - array_min]] = idx
+                offsets[num - array_min] += 1
+
+            return order
+
+    counter = {}
+    for num in array:
+        counter[num] = counter.get(num, 0) + 1
+
+    offsets, total = {}, 0
+    for num in sorted(counter):
+        offsets[num] = total
+        total += counter[num]
+
+    for idx, num in enumerate(array):
+        order[offsets[num]] = idx
+        offsets[num] += 1
+
+    return order
+
+
+def _is_dense(array_min, array_max, array_len):
+    """A range is dense if counting every value in it costs about as much as the array itself"""
+    return array_max - array_min <= 4 * array_len + 256
+
+
+def _radix_argsort(array):
+    """
+    | LSD radix sort of the indices, one byte per pass
+    | Keys are shifted by the minimum, so negative integers are handled
+    | Each pass is a stable prefix-sum scatter into a preallocated buffer
+    """
+    array_len = len(array)
+    order = int_array('q', range(array_len))
+    if array_len == 0:
+        return order
+
+    array_min = min(array)
+    keys = [num - array_min for num in array]
+    num_bytes = (max(keys).bit_length() + 7) // 8
+
+    buffer = int_array('q', bytes(8 * array_len))
+    for byte in range(num_bytes):
+        shift = 8 * byte
+
+        counts = [0] * 256
+        for key in keys:
+            counts[(key >> shift) & 0xFF] += 1
+        if array_len in counts:
+            continue  # every key has the same digit
+
+        total = 0
+        for digit in range(256):
+            counts[digit], total = total, total + counts[digit]
+
+        for idx in order:
+            digit = (keys[idx] >> shift) & 0xFF
+            buffer[counts[digit]] = idx
+            counts[digit] += 1
+
+        order, buffer = buffer, order
+
+    return order
+
+
+def _msd_radix_argsort(keys, small_size=16):
+    """
+    | MSD radix sort of the indices of a list of bytes, one byte per level
+    | Bucket 0 holds keys that end at this depth, so prefixes sort first
+    | Ranges of small_size or fewer keys are finished with insertion sort
+    | Uses an explicit stack of (start, stop, depth) instead of recursion
+    """
+    array_len = len(keys)
+    order = int_array('q', range(array_len))
+    buffer = int_array('q', bytes(8 * array_len))
+
+    stack = [(0, array_len, 0)]
+    while stack:
+        start, stop, depth = stack.pop()
+
+        if stop - start <= small_size:
+            for i in range(start + 1, stop):
+                idx = order[i]
+                key = keys[idx]
+                j = i - 1
+                while j >= start and key < keys[order[j]]:
+                    order[j + 1] = order[j]
+                    j -= 1
+                order[j + 1] = idx
+            continue
+
+        counts = [0] * 257
+        for i in range(start, stop):
+            key = keys[order[i]]
+            counts[key[depth] + 1 if depth < len(key) else 0] += 1
+
+        if counts[0] == stop - start:
+            continue  # every key ended
+        if stop - start in counts:
+            stack.append((start, stop, depth + 1))  # every key has the same byte
+            continue
+
+        offsets, total = [], start
+        for count in counts:
+            offsets.append(total)
+            total += count
+        bucket_starts = offsets[:]
+
+        for i in range(start, stop):
+            idx = order[i]
+            key = keys[idx]
+            digit = key[depth] + 1 if depth < len(key) else 0
+            buffer[offsets[digit]] = idx
+            offsets[digit] += 1
+        order[start:stop] = buffer[start:stop]
+
+        for digit in range(1, 257):
+            if counts[digit] > 1:
+                stack.append((bucket_starts[digit], bucket_starts[digit] + counts[digit], depth + 1))
+
+    return order
+
+
+def _float_keys(array):
+    """
+    | Maps floats to unsigned ints that sort in the same order
+    | Flip every bit of negatives, flip only the sign bit of positives
+    | Adding 0.0 turns -0.0 into 0.0 so they stay equal
+    | NaNs of either sign get the largest key so they go last, like np.sort
+    """
+    bits = int_array('Q')
+    bits.frombytes(int_array('d', [num + 0.0 for num in array]).tobytes())
+
+    sign, mask = 1 << 63, (1 << 64) - 1
+    keys = [key ^ mask if key & sign else key | sign for key in bits]
+    for idx, num in enumerate(array):
+        if num != num:
+            keys[idx] = mask
+    return keys
+
+
+def _radix_order(array):
+    """Picks the radix engine based on the item types and returns the sorting permutation"""
+    types = set(map(type, array))
+
+    if types <= {int, bool}:
+        return _radix_argsort(array)
+    elif types <= {int, bool, float}:
+        return _radix_argsort(_float_keys(array))
+    elif types == {str}:
+        return _msd_radix_argsort([item.encode('utf-8') for item in array])
+    elif types == {bytes}:
+        return _msd_radix_argsort(array)
+
+    raise TypeError(f"radix_sort needs ints, floats, strs or bytes, got {sorted(t.__name__ for t in types)}")
+
+
+def external_sort(input_path, output_path, key=None, column=None,
+                  memory_limit=2**30, algorithm='auto', sep='\t', strip='!\n',
+                  header=False, compress=None, fan_in=64, tmp_dir=None):
+    """
+    | Sorts the lines of a text or gzipped text file that doesn't fit in memory
+    | Files ending in .gz are read and written with gzip, use compress to override the output
+
+    #. Read lines until the chunk reaches roughly memory_limit bytes
+    #. Sort the chunk with argsort using algorithm, spill it to a temporary run file
+    #. k-way merge the runs with a heap, streaming the output line by line
+    #. If there are more than fan_in runs, merge them in several passes
+
+    | Rows are parsed like read_gzipped_tsv: strip, split on sep, remove quotes
+    | Sort key:
+
+    #. column, sort by row[column]
+    #. key, sort by key(row), or key(row[column]) if column is also given
+    #. neither, sort by the whole line
+
+    | Stable, equal keys keep their input order
+
+    .. code-block:: python
+
+        external_sort('data/export.tsv.gz', 'data/export_sorted.tsv.gz',
+                      column=2, key=int, memory_limit=2**30, header=True)
+
+    """
+    line_key = _line_key_func(key, column, sep, strip)
+    chunk_limit = memory_limit // 2  # leave room for keys and the permutation
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+
+        # spill sorted runs
+        run_paths = []
+        with _open_text(input_path, 'r') as f:
+            header_line = _ensure_newline(f.readline()) if header else None
+
+            lines, chunk_size = [], 0
+            for line in f:
+                lines.append(line)
+                chunk_size += sys.getsizeof(line)
+                if chunk_size >= chunk_limit:
+                    run_paths.append(_spill_run(lines, line_key, algorithm, run_dir, len(run_paths)))
+                    lines, chunk_size = [], 0
+            if lines:
+                run_paths.append(_spill_run(lines, line_key, algorithm, run_dir, len(run_paths)))
+            del lines
+
+        # merge runs until one pass fits in fan_in open files
+        num_passes = 0
+        while len(run_paths) > fan_in:
+            num_passes += 1
+            merged_paths = []
+            for i in range(0, len(run_paths), fan_in):
+                merged_path = os.path.join(run_dir, f'pass_{num_passes}_{i // fan_in}.txt')
+                _kway_merge_files(run_paths[i:i + fan_in], merged_path, line_key)
+                for run_path in run_paths[i:i + fan_in]:
+                    os.remove(run_path)
+                merged_paths.append(merged_path)
+            run_paths = merged_paths
+
+        _kway_merge_files(run_paths, output_path, line_key,
+                          header_line=header_line, compress=compress)
+
+    return output_path
+
+
+def _line_key_func(key, column, sep, strip):
+    """Returns a function that maps a raw line to its sort key"""
+
+    if key is None and column is None:
+        return lambda line: line.rstrip('\n')
+
+    def line_key(line):
+        row = [field.strip("\"") for field in line.strip(strip).split(sep)]
+        if column is not None:
+            row = row[column]
+        return row if key is None else key(row)
+
+    return line_key
+
+
+def _open_text(path, mode, compress=None):
+    """Opens gzip files in text mode, otherwise opens a normal text file"""
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, f'{mode}t', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def _ensure_newline(line):
+    if line and not line.endswith('\n'):
+        return line + '\n'
+    return line
+
+
+def _spill_run(lines, line_key, algorithm, run_dir, run_idx):
+    """Sorts one chunk of lines and writes it to a temporary run file"""
+    order = argsort([line_key(line) for line in lines], algorithm)
+
+    run_path = os.path.join(run_dir, f'run_{run_idx}.txt')
+    with _open_text(run_path, 'w') as f:
+        f.writelines(_ensure_newline(lines[idx]) for idx in order)
+
+    return run_path
+
+
+def _kway_merge_files(paths, output_path, line_key, header_line=None, compress=None):
+    """Stable heap merge of sorted run files into output_path"""
+    files = [_open_text(path, 'r') for path in paths]
+    try:
+        with _open_text(output_path, 'w', compress) as out:
+            if header_line:
+                out.write(header_line)
+            out.writelines(heapq.merge(*files, key=line_key))
+    finally:
+        for f in files:
+            f.close()
+
+
+def parallel_sort(array, workers=None, algorithm='auto', min_chunk_size=10000):
+    """
+    | Sorts chunks of the array in a ProcessPoolExecutor, then merges them
+    | Each chunk is sorted by sort(chunk, algorithm), so any sorter in SORTERS can be used
+
+    | Numeric inputs are copied once into shared memory and sorted in-place by the workers,
+    | then merged pairwise with np.searchsorted, so no chunk is pickled
+    | Other lists are pickled to the workers and merged with a k-way heap merge
+
+    | workers defaults to os.cpu_count()
+    | Falls back to sort when the array is too small to split into min_chunk_size chunks
+
+    .. code-block:: python
+
+        >>> parallel_sort(np.random.randint(0, 10**9, 10**8), workers=32)
+
+    """
+    workers = workers or os.cpu_count()
+    array_len = len(array)
+    num_chunks = min(workers, array_len // min_chunk_size)
+    if num_chunks <= 1:
+        return sort(array, algorithm)
+
+    bounds = [array_len * i // num_chunks for i in range(num_chunks + 1)]
+
+    if _numeric_kind(array) is not None:
+        result = _parallel_sort_shared(np.asarray(array), bounds, workers, algorithm)
+        return result if isinstance(array, np.ndarray) else result.tolist()
+
+    chunks = [array[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(sort, chunks, repeat(algorithm)))
+
+    return list(heapq.merge(*chunks))
+
+
+def _parallel_sort_shared(array, bounds, workers, algorithm):
+    """Sorts chunks of a numeric array in shared memory, then merges them"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        shared[:] = array
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_sort_shared_chunk,
+                              repeat(shm.name), repeat(array.dtype.str), repeat(array.size),
+                              bounds[:-1], bounds[1:], repeat(algorithm)))
+
+        chunks = [shared[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        while len(chunks) > 1:
+            merged = [_merge_sorted_arrays(chunks[i], chunks[i + 1])
+                      for i in range(0, len(chunks) - 1, 2)]
+            if len(chunks) % 2:
+                merged.append(chunks[-1])
+            chunks = merged
+
+        result = chunks[0].copy()
+        del shared, chunks
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return result
+
+
+def _sort_shared_chunk(shm_name, dtype, size, start, stop, algorithm):
+    """Worker: attaches to the shared array and sorts array[start:stop] in-place"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        chunk = np.ndarray((size,), dtype=dtype, buffer=shm.buf)[start:stop]
+        chunk[:] = sort(chunk, algorithm)
+        del chunk
+    finally:
+        shm.close()
+
+
+def _merge_sorted_arrays(left, right):
+    """
+    | Stable vectorized merge of two sorted arrays
+    | Each item's output position is its own index plus its rank in the other array
+    """
+    merged = np.empty(left.size + right.size, dtype=np.result_type(left, right))
+    merged[np.searchsorted(right, left, side='left') + np.arange(left.size)] = left
+    merged[np.searchsorted(left, right, side='right') + np.arange(right.size)] = right
+    return merged
+
+
+def select_kth(array, k):
+    """
+    | Returns the kth smallest item, k starts at 0
+    | Quickselect with a three-way partition on a copy of the array, O(n) on average
+    | Any iterable works, NumPy arrays use np.partition
+
+    .. code-block:: python
+
+        >>> select_kth([6, 2, 4, 5, 1, 3], 2)
+        3
+        >>> select_kth(array, len(array) // 2)  # median
+    """
+    if not isinstance(array, np.ndarray):
+        array = list(array)
+
+    if not 0 <= k < len(array):
+        raise IndexError(f"k={k} out of range for array of length {len(array)}")
+
+    if isinstance(array, np.ndarray):
+        return np.partition(array, k)[k]
+
+    return _quickselect(array, k, 0, len(array) - 1)[k]
+
+
+def partial_sort(array, k):
+    """
+    | Sorts in-place so that array[:k] holds the k smallest items in order
+    | The rest of the array is left in no particular order
+    | Quickselect the kth item, then introsort the first k, O(n + k log k)
+    | NumPy arrays use np.partition and return a new array
+
+    .. code-block:: python
+
+        >>> partial_sort([6, 2, 4, 5, 1, 3], 3)[:3]
+        [1, 2, 3]
+    """
+    k = min(k, len(array))
+    if k <= 0:
+        return array
+
+    if isinstance(array, np.ndarray):
+        array = np.partition(array, k - 1)
+        array[:k].sort()
+        return array
+
+    _quickselect(array, k - 1, 0, len(array) - 1)
+    return introsort(array, 0, k - 1)
+
+
+def top_k(array, k, key=None, largest=True):
+    """
+    | Returns the k largest items, largest first, or the k smallest if largest=False
+    | Accepts any iterable, including generators, and only keeps a bounded heap of k items
+    | Use it directly on row streams, eg. top_k(iter_gzipped_tsv(path), 100, key=lambda row: float(row[3]))
+    | NumPy arrays use np.argpartition when no key is given
+
+    .. code-block:: python
+
+        >>> top_k([6, 2, 4, 5, 1, 3], 3)
+        [6, 5, 4]
+    """
+    if k <= 0:
+        return array[:0] if isinstance(array, np.ndarray) and key is None else []
+
+    if isinstance(array, np.ndarray) and key is None:
+        k = min(k, array.size)
+        if largest:
+            idx = np.argpartition(array, array.size - k)[array.size - k:]
+            return array[idx[np.argsort(array[idx], kind='stable')[::-1]]]
+        idx = np.argpartition(array, k - 1)[:k]
+        return array[idx[np.argsort(array[idx], kind='stable')]]
+
+    if largest:
+        return heapq.nlargest(k, array, key=key)
+    return heapq.nsmallest(k, array, key=key)
+
+
+def _three_way_partition(array, lo, hi, pivot_num):
+    """
+    | Dutch national flag partition of array[lo:hi + 1] around pivot_num
+    | Returns (lt, gt) such that array[lo:lt] < pivot_num, array[lt:gt + 1] == pivot_num, array[gt + 1:hi + 1] > pivot_num
+    """
+    lt, i, gt = lo, lo, hi
+    while i <= gt:
+        if array[i] < pivot_num:
+            array[lt], array[i] = array[i], array[lt]
+            lt += 1
+            i += 1
+        elif pivot_num < array[i]:
+            array[gt], array[i] = array[i], array[gt]
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
+
+
+def _quickselect(array, k, start, stop):
+    """
+    | Partitions array[start:stop + 1] with random pivots until array[k] is in place
+    | Three-way partitions, so every copy of the pivot is placed in one pass
+    | and duplicate-heavy inputs stay O(n) on average
+    | Only continues into the side that contains k, so it is a loop
+    """
+    while start < stop:
+        lt, gt = _three_way_partition(array, start, stop, array[random.randint(start, stop)])
+        if k < lt:
+            stop = lt - 1
+        elif k > gt:
+            start = gt + 1
+        else:
+            break
+
+    return array
+
+
+SORTERS = {
+    'bubble': bubble_sort,
+    'selection': selection_sort,
+    'insertion': insertion_sort,
+    'counting': counting_sort,
+    'tree': tree_sort,
+    'merge': merge_sort,
+    'bottom_up_merge': bottom_up_merge_sort,
+    'radix': radix_sort,
+    'quick': quick_sort,
+    'intro': introsort,
+    'heap': heap_sort,
+}
+
+NP_SORTERS = {
+    'numpy': np_sort,
+    'numpy_counting': np_counting_sort,
+    'numpy_radix': np_radix_sort,
+    'numpy_merge': np_merge_sort,
+}
+
+
+# ----------------------------------------------------------------------
+# Deprecated
+
+
+def idx_hash_table_for_array(array):
+    """
+    | Returns a dictionary with ids as keys and a list of indexes as values.
+    | Deprecated: ids collide for interned ints and equal floats, use argsort instead
+    """
+    warnings.warn("idx_hash_table_for_array is deprecated, use argsort instead",
+                  DeprecationWarning, stacklevel=2)
+
+    hash_table = {}
+    for original_idx, num in enumerate(array):
+        if hash_table.get(id(num)) is None:
+            hash_table[id(num)] = deque([original_idx])
+        else:
+            hash_table[id(num)].append(original_idx)
+
+    return hash_table
+
+
+def map_hash(array, hash_table):
+    """
+    | Returns original positions of a sorted array
+    | Use in conjunction with idx_hash_table_for_array
+    | Deprecated: copies the whole table on every call, use argsort and take instead
+    """
+    warnings.warn("map_hash is deprecated, use argsort and take instead",
+                  DeprecationWarning, stacklevel=2)
+    temp_hash_table = deepcopy(hash_table)  # preserve original copy
+    return [temp_hash_table[id(num)].popleft() for num in array]
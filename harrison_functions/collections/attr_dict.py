@@ -1,8 +1,9 @@
-from collections import Mapping, MutableSequence
+from collections.abc import Mapping, MutableSequence, Sequence
 
 # Objects
 # # ConvenienceDict
 # # AttrDict
+# # LazySequence
 
 
 class ConvenienceDict(dict):
@@ -39,25 +40,145 @@ class AttrDict:
 
     | See: https://stackoverflow.com/questions/4984647/accessing-dict-keys-like-an-attribute
 
+    | The mapping is wrapped as is, never copied
+    | Child wrappers are memoized per key, so walking cfg.a.b.c in a loop builds each wrapper once
+    | A memoized child is rebuilt if the value under its key is replaced
+    | Lists come back as a LazySequence, which wraps items only when they're accessed
+    | A LazySequence is a Sequence but not a list, use .to_list() for isinstance(x, list) checks or json.dumps
+
+    .. code-block:: python
+
+        >>> cfg = AttrDict(read_json('config.json'))
+        >>> cfg.database.hosts[0].port
+        5432
+        >>> cfg['key with spaces']
     """
 
+    __slots__ = ('_data', '_children')
+
     def __init__(self, mapping):
-        self._data = dict(mapping)
+        self._data = mapping
+        self._children = {}
 
     def __getattr__(self, name):
+        if name.startswith('__') or name in AttrDict.__slots__:
+            raise AttributeError(name)  # not set up yet, eg. during copy or pickle
+
+        # attributes of the mapping, eg. .items(), always win over keys, memoized or not
         if hasattr(self._data, name):
             return getattr(self._data, name)
         else:
-            return AttrDict.build(self._data[name])
+            return self[name]
+
+    def __getitem__(self, key):
+        value = self._data[key]
+
+        cached = self._children.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        child = AttrDict.build(value)
+        if child is not value:
+            self._children[key] = (value, child)
+        return child
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __dir__(self):
+        return [key for key in self._data if isinstance(key, str)]
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, state):
+        self._data = state
+        self._children = {}
 
     @classmethod
     def build(cls, obj):
         if isinstance(obj, Mapping):
             return cls(obj)
         elif isinstance(obj, MutableSequence):
-            return [cls.build(item) for item in obj]
+            return LazySequence(obj)
         else:
             return obj
         
     def __repr__(self):
         return self._data.__repr__()
+
+
+class LazySequence(Sequence):
+    """
+    | Read-only proxy over a list inside an AttrDict
+    | Items are wrapped with AttrDict.build when accessed and memoized per index, nothing is copied
+    | Slices return a LazySequence over the sliced list
+    | It's a collections.abc.Sequence and compares equal to the list it wraps, but it isn't a list,
+    | to_list returns the wrapped list for code that checks isinstance(x, list) or calls json.dumps
+    """
+
+    __slots__ = ('_data', '_children')
+
+    def __init__(self, sequence):
+        self._data = sequence
+        self._children = {}
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return LazySequence(self._data[idx])
+
+        value = self._data[idx]
+        if idx < 0:
+            idx += len(self._data)
+
+        cached = self._children.get(idx)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        child = AttrDict.build(value)
+        if child is not value:
+            self._children[idx] = (value, child)
+        return child
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        for idx in range(len(self._data)):
+            yield self[idx]
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def index(self, item, *args):
+        return self._data.index(item, *args)
+
+    def count(self, item):
+        return self._data.count(item)
+
+    def to_list(self):
+        """Returns the wrapped list itself, not a copy"""
+        return self._data
+
+    def __eq__(self, other):
+        if isinstance(other, LazySequence):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self._data
+
+    def __setstate__(self, state):
+        self._data = state
+        self._children = {}
+
+    def __repr__(self):
+        return self._data.__repr__()
@@ -0,0 +1,416 @@
+import sys
+import time
+import threading
+from functools import wraps
+from .custom_errors import ItemNotFoundError, MethodNotFoundError
+from .linked_list import DoublyNode, DoublyLinkedList
+
+# Functions
+# # cached
+
+# Classes
+# # CacheNode
+# # CacheStats
+# # LRUCache
+# # LFUCache
+# # ThreadSafeCache
+
+
+class CacheNode(DoublyNode):
+    """DoublyNode that also holds the key, size in bytes, expiry time and access count of an entry"""
+
+    __slots__ = ('key', 'nbytes', 'expires_at', 'count')
+
+    def __init__(self, key, data, nbytes=0, expires_at=None):
+        super().__init__(data)
+        self.key = key
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+        self.count = 1
+
+
+class CacheStats:
+    """
+    | Counters for a cache
+
+    #. hits, lookups that found a live entry
+    #. misses, lookups that found nothing or an expired entry
+    #. evictions, entries dropped to stay under max_size or max_bytes
+    #. expirations, entries dropped because their ttl ran out
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hit_rate}
+
+    def __repr__(self):
+        return (f'CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, '
+                f'expirations={self.expirations}, hit_rate={self.hit_rate:.2%})')
+
+
+class LRUCache:
+    """
+    | Least recently used cache, a dict maps keys to nodes of a DoublyLinkedList
+    | Hits move their node to the front, evictions pop from the back
+
+    | Bounds, either or both:
+
+    #. max_size, number of entries
+    #. max_bytes, total of sizeof(value), sys.getsizeof by default, which doesn't follow references
+       Pass a deeper sizeof for nested values, eg. lambda df: df.memory_usage(deep=True).sum()
+
+    | ttl is in seconds, entries older than that are dropped when they're next looked up
+    | Use expire to sweep them all at once
+    | Not thread-safe, see ThreadSafeCache
+
+    | Runtimes:
+
+    #. get, put, pop, contains, len: O(1)
+    #. expire: O(n)
+
+    .. code-block:: python
+
+        >>> cache = LRUCache(max_size=2)
+        >>> cache.put('a', 1)
+        >>> cache.put('b', 2)
+        >>> cache.get('a')
+        1
+        >>> cache.put('c', 3)  # evicts 'b'
+        >>> 'b' in cache, cache.stats
+        (False, CacheStats(hits=1, misses=0, evictions=1, expirations=0, hit_rate=100.00%))
+    """
+
+    def __init__(self, max_size=128, max_bytes=None, ttl=None, sizeof=sys.getsizeof, timer=time.monotonic):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.timer = timer
+
+        self.index = {}
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self._init_order()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        """Doesn't count as a lookup or refresh the entry"""
+        node = self.index.get(key)
+        return node is not None and not self._is_expired(node)
+
+    def __getitem__(self, key):
+        node = self._lookup(key)
+        if node is None:
+            raise ItemNotFoundError(f"{key} is not in the cache")
+        return node.data
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(size={len(self)}, nbytes={self.nbytes}, {self.stats})'
+
+    def get(self, key, default=None):
+        node = self._lookup(key)
+        return default if node is None else node.data
+
+    def put(self, key, value, ttl=None):
+        """
+        | Adds or replaces an entry, evicting first until there is room for it
+        | ttl overrides the cache's ttl for this entry
+        | A value bigger than max_bytes on its own isn't cached
+        """
+        nbytes = self.sizeof(value) if self.max_bytes is not None else 0
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = self.timer() + ttl if ttl is not None else None
+
+        node = self.index.get(key)
+        if node is not None:
+            self._remove(node)
+
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return None
+
+        # evict first, so the new entry can't be its own victim, LFU would pick it with count 1
+        while self.index and (
+                (self.max_size is not None and len(self.index) >= self.max_size) or
+                (self.max_bytes is not None and self.nbytes + nbytes > self.max_bytes)):
+            self._remove(self._victim())
+            self.stats.evictions += 1
+
+        if self.max_size is not None and self.max_size <= 0:
+            return None
+
+        node = CacheNode(key, value, nbytes, expires_at)
+        self.index[key] = node
+        self.nbytes += nbytes
+        self._link(node)
+
+    def pop(self, key, *default):
+        """Removes an entry and returns its value, like dict.pop"""
+        node = self.index.get(key)
+        if node is None or self._is_expired(node):
+            if node is not None:
+                self._remove(node)
+                self.stats.expirations += 1
+            if default:
+                return default[0]
+            raise ItemNotFoundError(f"{key} is not in the cache")
+
+        self._remove(node)
+        return node.data
+
+    def expire(self):
+        """Drops every expired entry, returns how many were dropped"""
+        now = self.timer()
+        expired = [node for node in self.index.values()
+                   if node.expires_at is not None and node.expires_at <= now]
+        for node in expired:
+            self._remove(node)
+        self.stats.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self.index.clear()
+        self.nbytes = 0
+        self._init_order()
+
+    def keys(self):
+        """Most recently used first"""
+        return [node.key for node in self._iter_nodes()]
+
+    def _lookup(self, key):
+        """Returns the live node for key and refreshes it, or None, counting the hit or miss"""
+        node = self.index.get(key)
+        if node is not None and self._is_expired(node):
+            self._remove(node)
+            self.stats.expirations += 1
+            node = None
+
+        if node is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self._touch(node)
+        return node
+
+    def _is_expired(self, node):
+        return node.expires_at is not None and node.expires_at <= self.timer()
+
+    def _remove(self, node):
+        del self.index[node.key]
+        self.nbytes -= node.nbytes
+        self._unlink(node)
+
+    # eviction policy, LFUCache overrides these
+
+    def _init_order(self):
+        self.order = DoublyLinkedList()
+
+    def _link(self, node):
+        self.order.push(node)
+
+    def _unlink(self, node):
+        self.order.remove(node)
+
+    def _touch(self, node):
+        self.order.move_to_front(node)
+
+    def _victim(self):
+        return self.order.tail
+
+    def _iter_nodes(self):
+        node = self.order.head
+        while node is not None:
+            yield node
+            node = node.next
+
+
+class LFUCache(LRUCache):
+    """
+    | Least frequently used cache, ties are broken by least recently used
+    | Each access count has its own DoublyLinkedList, a hit moves its node to the list of count + 1
+    | Evictions pop from the front of the list with the lowest count
+    | Same bounds, ttl and runtimes as LRUCache
+
+    .. code-block:: python
+
+        >>> cache = LFUCache(max_size=2)
+        >>> cache.put('a', 1)
+        >>> cache.put('b', 2)
+        >>> cache.get('a'), cache.get('a')
+        (1, 1)
+        >>> cache.put('c', 3)  # evicts 'b', it was used least
+        >>> cache.keys()
+        ['a', 'c']
+    """
+
+    def _init_order(self):
+        self.counts = {}  # access count -> DoublyLinkedList, oldest first
+        self.min_count = 0
+
+    def _link(self, node):
+        node.count = 1
+        self.counts.setdefault(1, DoublyLinkedList()).append(node)
+        self.min_count = 1
+
+    def _unlink(self, node):
+        nodes = self.counts[node.count]
+        nodes.remove(node)
+        if not nodes:
+            del self.counts[node.count]
+
+    def _touch(self, node):
+        count = node.count
+        self._unlink(node)
+        if count == self.min_count and count not in self.counts:
+            self.min_count = count + 1
+
+        node.count = count + 1
+        self.counts.setdefault(node.count, DoublyLinkedList()).append(node)
+
+    def _victim(self):
+        if self.min_count not in self.counts:
+            # the least used entries were removed by pop or expiry
+            self.min_count = min(self.counts)
+        return self.counts[self.min_count].head
+
+    def _iter_nodes(self):
+        """Most used first"""
+        for count in sorted(self.counts, reverse=True):
+            node = self.counts[count].tail
+            while node is not None:
+                yield node
+                node = node.prev
+
+
+class ThreadSafeCache:
+    """
+    | Wraps an LRUCache or LFUCache so every operation holds a lock
+    | A lookup refreshes the entry, so even reads need the lock
+
+    .. code-block:: python
+
+        >>> cache = ThreadSafeCache(LRUCache(max_size=1000, ttl=60))
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.RLock()
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def __len__(self):
+        with self.lock:
+            return len(self.cache)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.cache
+
+    def __getitem__(self, key):
+        with self.lock:
+            return self.cache[key]
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.cache[key] = value
+
+    def __delitem__(self, key):
+        with self.lock:
+            del self.cache[key]
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.cache!r})'
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.cache.get(key, default)
+
+    def put(self, key, value, ttl=None):
+        with self.lock:
+            self.cache.put(key, value, ttl)
+
+    def pop(self, key, *default):
+        with self.lock:
+            return self.cache.pop(key, *default)
+
+    def expire(self):
+        with self.lock:
+            return self.cache.expire()
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def keys(self):
+        with self.lock:
+            return self.cache.keys()
+
+
+_MISSING = object()
+
+
+def cached(max_size=128, max_bytes=None, ttl=None, policy='lru', thread_safe=False, sizeof=sys.getsizeof):
+    """
+    | Decorator that caches the results of a pure function, keyed on its arguments
+    | Arguments must be hashable, keyword order doesn't matter
+    | policy: ['lru', 'lfu']
+    | The wrapper gets .cache, .cache_info() for the CacheStats and .cache_clear()
+    | With thread_safe=True two threads can still compute the same missing value at once,
+    | only the cache itself is protected
+
+    .. code-block:: python
+
+        >>> @cached(max_size=32, ttl=300)
+        ... def load_config(path):
+        ...     return read_json(path)
+        >>> load_config.cache_info()
+        CacheStats(hits=0, misses=0, evictions=0, expirations=0, hit_rate=0.00%)
+    """
+    policies = {'lru': LRUCache, 'lfu': LFUCache}
+    if policy not in policies:
+        raise MethodNotFoundError(f"Please check your input: policy='{policy}'")
+
+    def decorator(func):
+        cache = policies[policy](max_size=max_size, max_bytes=max_bytes, ttl=ttl, sizeof=sizeof)
+        if thread_safe:
+            cache = ThreadSafeCache(cache)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, frozenset(kwargs.items())) if kwargs else args
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache
+        wrapper.cache_info = lambda: cache.stats
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
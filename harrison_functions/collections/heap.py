@@ -0,0 +1,299 @@
+import operator
+import numpy as np
+from .custom_errors import EmptyListError, ItemNotFoundError, MethodNotFoundError
+
+# Functions
+# # kway_merge
+
+# Classes
+# # ArrayHeap
+# # MinHeap
+# # MaxHeap
+
+
+class ArrayHeap:
+    """
+    | Binary heap stored in a flat array, the children of i are at 2i+1 and 2i+2
+    | Each entry is a priority and an optional item
+    | Use MinHeap or MaxHeap rather than this class directly
+
+    | backend='list' stores priorities in a list, any comparable type works
+    | backend='numpy' stores numeric priorities in an ndarray that doubles when full
+
+    | Items are indexed by position, so decrease_key, update and remove are O(log n)
+    | Indexed items must be hashable and unique, items that are None are not indexed
+    | Set track_positions=False to store any payload, eg. rows in a k-way merge
+
+    | Runtimes:
+
+    #. push, pop, pushpop, update, remove: O(log n)
+    #. peek, len, contains: O(1)
+    #. heapify, merge: O(n)
+
+    .. code-block:: python
+
+        >>> heap = MinHeap()
+        >>> heap.push(5, 'write report')
+        >>> heap.push(1, 'fix prod')
+        >>> heap.push(3, 'review PR')
+        >>> heap.decrease_key('write report', 0)
+        >>> heap.pop()
+        (0, 'write report')
+    """
+
+    _less = staticmethod(operator.lt)
+
+    def __init__(self, backend='list', dtype=np.float64, capacity=16, track_positions=True):
+        if backend not in ('list', 'numpy'):
+            raise MethodNotFoundError(f"Please check your input: backend='{backend}'")
+        self.backend = backend
+        self.dtype = dtype
+        self.size = 0
+        self.priorities = [] if backend == 'list' else np.empty(capacity, dtype=dtype)
+        self.items = []
+        self.positions = {} if track_positions else None
+
+    @classmethod
+    def heapify(cls, priorities, items=None, backend='list', dtype=np.float64, track_positions=True):
+        """
+        | Builds a heap from existing priorities and items in O(n)
+        | Sifts down every parent, starting from the last one
+        """
+        heap = cls(backend=backend, dtype=dtype, track_positions=track_positions)
+
+        if backend == 'numpy':
+            heap.priorities = np.array(priorities, dtype=dtype)
+            heap.size = heap.priorities.size
+        else:
+            heap.priorities = list(priorities)
+            heap.size = len(heap.priorities)
+
+        heap.items = list(items) if items is not None else [None] * heap.size
+        if len(heap.items) != heap.size:
+            raise ValueError("priorities and items must have the same length")
+
+        if track_positions:
+            for idx, item in enumerate(heap.items):
+                if item is not None:
+                    heap.positions[item] = idx
+
+        for idx in range(heap.size // 2 - 1, -1, -1):
+            heap._sift_down(idx)
+
+        return heap
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __contains__(self, item):
+        if self.positions is None:
+            return item in self.items
+        return item in self.positions
+
+    def __repr__(self):
+        return f'{type(self).__name__}(size={self.size}, top={self.peek() if self.size else None})'
+
+    def peek(self):
+        """Returns the top (priority, item) without removing it"""
+        if self.size == 0:
+            raise EmptyListError("heap is empty")
+        return self.priorities[0], self.items[0]
+
+    def push(self, priority, item=None):
+        tracked = self.positions is not None and item is not None
+        if tracked and item in self.positions:
+            raise ValueError(f"{item} is already in the heap, use update instead")
+
+        if self.backend == 'numpy':
+            if self.size == self.priorities.size:
+                self.priorities = np.concatenate([self.priorities, np.empty(max(self.size, 16), dtype=self.dtype)])
+            self.priorities[self.size] = priority
+        else:
+            self.priorities.append(priority)
+        self.items.append(item)
+        if tracked:
+            self.positions[item] = self.size
+
+        self.size += 1
+        self._sift_up(self.size - 1)
+
+    def pop(self):
+        """Removes and returns the top (priority, item)"""
+        if self.size == 0:
+            raise EmptyListError("heap is empty")
+
+        top = self.priorities[0], self.items[0]
+        self._remove_at(0)
+        return top
+
+    def pushpop(self, priority, item=None):
+        """
+        | Push, then pop, in one sift
+        | If the new entry would be the top, it is returned without touching the heap
+        """
+        if self.size == 0 or not self._less(self.priorities[0], priority):
+            return priority, item
+
+        top = self.priorities[0], self.items[0]
+        if self.positions is not None:
+            if item is not None and item in self.positions:
+                raise ValueError(f"{item} is already in the heap, use update instead")
+            if top[1] is not None:
+                del self.positions[top[1]]
+            if item is not None:
+                self.positions[item] = 0
+
+        self.priorities[0], self.items[0] = priority, item
+        self._sift_down(0)
+
+        return top
+
+    def update(self, item, priority):
+        """Changes the priority of item, then sifts it up or down"""
+        idx = self._position(item)
+        old_priority = self.priorities[idx]
+        self.priorities[idx] = priority
+
+        if self._less(priority, old_priority):
+            self._sift_up(idx)
+        else:
+            self._sift_down(idx)
+
+    def decrease_key(self, item, priority):
+        """
+        | Moves item closer to the top
+        | For a MinHeap the new priority must be smaller, for a MaxHeap larger
+        """
+        idx = self._position(item)
+        if self._less(self.priorities[idx], priority):
+            raise ValueError(f"new priority {priority} would move {item} away from the top")
+        self.priorities[idx] = priority
+        self._sift_up(idx)
+
+    def remove(self, item):
+        """Removes item and returns its priority"""
+        idx = self._position(item)
+        priority = self.priorities[idx]
+        self._remove_at(idx)
+        return priority
+
+    def merge(self, other):
+        """Returns a new heap with the entries of both heaps, O(n + m)"""
+        if type(other) is not type(self):
+            raise TypeError(f"can't merge {type(self).__name__} with {type(other).__name__}")
+
+        return type(self).heapify(
+            list(self.priorities[:self.size]) + list(other.priorities[:other.size]),
+            self.items + other.items,
+            backend=self.backend, dtype=self.dtype, track_positions=self.positions is not None,
+        )
+
+    def _position(self, item):
+        if self.positions is None:
+            raise MethodNotFoundError("positions aren't tracked, create the heap with track_positions=True")
+        try:
+            return self.positions[item]
+        except KeyError:
+            raise ItemNotFoundError(f"{item} is not in the heap")
+
+    def _remove_at(self, idx):
+        """Moves the last entry into idx, then restores the heap"""
+        tracked = self.positions is not None
+        if tracked and self.items[idx] is not None:
+            del self.positions[self.items[idx]]
+
+        last = self.size - 1
+        if idx != last:
+            self.priorities[idx], self.items[idx] = self.priorities[last], self.items[last]
+            if tracked and self.items[idx] is not None:
+                self.positions[self.items[idx]] = idx
+
+        if self.backend == 'list':
+            self.priorities.pop()
+        self.items.pop()
+        self.size -= 1
+
+        if idx < self.size:
+            self._sift_down(idx)
+            self._sift_up(idx)
+
+    def _sift_up(self, idx):
+        priorities, items, positions, less = self.priorities, self.items, self.positions, self._less
+        priority, item = priorities[idx], items[idx]
+
+        while idx > 0:
+            parent = (idx - 1) >> 1
+            if not less(priority, priorities[parent]):
+                break
+            priorities[idx], items[idx] = priorities[parent], items[parent]
+            if positions is not None and items[idx] is not None:
+                positions[items[idx]] = idx
+            idx = parent
+
+        priorities[idx], items[idx] = priority, item
+        if positions is not None and item is not None:
+            positions[item] = idx
+
+    def _sift_down(self, idx):
+        priorities, items, positions, less = self.priorities, self.items, self.positions, self._less
+        size = self.size
+        priority, item = priorities[idx], items[idx]
+
+        child = 2 * idx + 1
+        while child < size:
+            if child + 1 < size and less(priorities[child + 1], priorities[child]):
+                child += 1
+            if not less(priorities[child], priority):
+                break
+            priorities[idx], items[idx] = priorities[child], items[child]
+            if positions is not None and items[idx] is not None:
+                positions[items[idx]] = idx
+            idx = child
+            child = 2 * idx + 1
+
+        priorities[idx], items[idx] = priority, item
+        if positions is not None and item is not None:
+            positions[item] = idx
+
+
+class MinHeap(ArrayHeap):
+    """ArrayHeap with the smallest priority on top"""
+
+    _less = staticmethod(operator.lt)
+
+
+class MaxHeap(ArrayHeap):
+    """ArrayHeap with the largest priority on top"""
+
+    _less = staticmethod(operator.gt)
+
+
+def kway_merge(*iterables, key=None):
+    """
+    | Merges sorted iterables lazily, keeping one entry per iterable in a MinHeap
+    | Stable, ties are broken by the order of the iterables
+    | Use heapq.merge if you don't need the heap afterwards, it's implemented in C
+
+    .. code-block:: python
+
+        >>> list(kway_merge([1, 4, 7], [2, 5], [3, 6]))
+        [1, 2, 3, 4, 5, 6, 7]
+    """
+    key = key or (lambda x: x)
+
+    heap = MinHeap(track_positions=False)
+    iterators = [iter(iterable) for iterable in iterables]
+    for source, iterator in enumerate(iterators):
+        for value in iterator:
+            heap.push((key(value), source), (source, value))
+            break
+
+    while heap:
+        (_, source), (_, value) = heap.pop()
+        yield value
+        for next_value in iterators[source]:
+            heap.push((key(next_value), source), (source, next_value))
+            break
@@ -1,8 +1,14 @@
-from itertools import islice
+import asyncio
+import threading
+import time
+from array import array
+from queue import Empty, Full
 from .custom_errors import EmptyListError, ItemNotFoundError
 
 
 class Node:
+    __slots__ = ('data', 'next')
+
     def __init__(self, data=None):
         self.data = data
         self.next = None
@@ -15,6 +21,22 @@ class LinkedList:
     def __init__(self, head=None):
         self.head = head
         self.current = self.head
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Builds the list in one pass, each new node is linked to the previous one"""
+        head = prev_node = None
+        for item in iterable:
+            node = Node(item)
+            if prev_node is None:
+                head = node
+            else:
+                prev_node.next = node
+            prev_node = node
+        return cls(head)
+
+    def to_list(self):
+        return list(self.return_all(lim=None))
         
     def get_current(self):
         return self.current.data
@@ -28,20 +50,19 @@ class LinkedList:
         return self.head.data
         
     def return_all(self, lim=100):
+        """Yields the first lim items, all of them if lim is None"""
         curr_node = self.head
         
         i = 0
-        while curr_node is not None:
+        while curr_node is not None and i != lim:
             yield curr_node.data
             curr_node = curr_node.next
             i += 1
-            if i == lim:
-                break
                 
     def print_all(self, lim=100):
-        """Prints the first 100 items
+        """Prints the first lim items
         """
-        for item in islice(self.return_all(), 0, 100):
+        for item in self.return_all(lim):
             print(item)
             
     def push(self, new_node):
@@ -233,3 +254,567 @@ class LinkedList:
             return first.data
         else:
             raise IndexError("list has fewer than 3 elements")
+
+
+class DoublyNode:
+    __slots__ = ('data', 'prev', 'next')
+
+    def __init__(self, data=None):
+        self.data = data
+        self.prev = None
+        self.next = None
+
+
+class DoublyLinkedList:
+    """
+    | Make sure to only add DoublyNode objects to the DoublyLinkedList
+    | Keeps head and tail pointers and a cached length, so both ends are O(1)
+    | Nodes link both ways, so a node can be unlinked or moved without searching for it
+
+    | Runtimes:
+
+    #. append, push, pop, popleft, move_to_front, move_to_back, remove: O(1)
+    #. len: O(1)
+    #. remove_item: O(n)
+
+    .. code-block:: python
+
+        >>> dll = DoublyLinkedList()
+        >>> nodes = [DoublyNode(item) for item in 'ABCD']
+        >>> for node in nodes:
+        ...     dll.append(node)
+        >>> dll.move_to_front(nodes[2])
+        >>> list(dll)
+        ['C', 'A', 'B', 'D']
+        >>> dll.pop().data, dll.popleft().data, len(dll)
+        ('D', 'C', 2)
+    """
+
+    def __init__(self):
+        self.head = None
+        self.tail = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __iter__(self):
+        return self.return_all(lim=None)
+
+    def return_all(self, lim=100):
+        curr_node = self.head
+        while curr_node is not None and lim != 0:
+            yield curr_node.data
+            curr_node = curr_node.next
+            if lim is not None:
+                lim -= 1
+
+    def return_all_reversed(self, lim=100):
+        curr_node = self.tail
+        while curr_node is not None and lim != 0:
+            yield curr_node.data
+            curr_node = curr_node.prev
+            if lim is not None:
+                lim -= 1
+
+    def print_all(self, lim=100):
+        """Prints the first lim items"""
+        for item in self.return_all(lim):
+            print(item)
+
+    def push(self, new_node):
+        """Insert node at beginning"""
+        new_node.prev, new_node.next = None, self.head
+        if self.head is None:
+            self.tail = new_node
+        else:
+            self.head.prev = new_node
+        self.head = new_node
+        self.size += 1
+
+    appendleft = push
+
+    def append(self, new_node):
+        """Insert node at end"""
+        new_node.prev, new_node.next = self.tail, None
+        if self.tail is None:
+            self.head = new_node
+        else:
+            self.tail.next = new_node
+        self.tail = new_node
+        self.size += 1
+
+    def remove(self, node):
+        """Unlinks node, it must be in this list"""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+
+        node.prev = node.next = None
+        self.size -= 1
+        return node
+
+    def remove_item(self, item):
+        """Unlinks the first node holding item, O(n)"""
+        curr_node = self.head
+        while curr_node is not None:
+            if curr_node.data == item:
+                return self.remove(curr_node)
+            curr_node = curr_node.next
+
+        raise ItemNotFoundError(f"{item} not found")
+
+    def pop(self):
+        """Removes and returns the last node"""
+        if self.tail is None:
+            raise EmptyListError("list is empty")
+        return self.remove(self.tail)
+
+    def popleft(self):
+        """Removes and returns the first node"""
+        if self.head is None:
+            raise EmptyListError("list is empty")
+        return self.remove(self.head)
+
+    def move_to_front(self, node):
+        if node is not self.head:
+            self.remove(node)
+            self.push(node)
+
+    def move_to_back(self, node):
+        if node is not self.tail:
+            self.remove(node)
+            self.append(node)
+
+    def remove_all(self):
+        self.head = self.tail = None
+        self.size = 0
+
+    def get_third_to_last_item(self):
+        """Walks back from the tail, O(1)"""
+        if self.size < 3:
+            raise IndexError("list has fewer than 3 elements")
+        return self.tail.prev.prev.data
+
+
+class PooledLinkedList:
+    """
+    | Singly linked list of items without Node objects
+    | Items sit in a list of slots, next pointers are ints in an array.array, -1 ends the list
+    | Removed slots go on a free list, chained through the same next array, and are reused first
+    | Both arrays double when full, so a long-lived queue stops allocating once it's warm
+
+    | Runtimes:
+
+    #. append, push, popleft, peek, len: O(1)
+    #. remove: O(n)
+
+    .. code-block:: python
+
+        >>> queue = PooledLinkedList.from_iterable(['a', 'b'])
+        >>> queue.append('c')
+        >>> queue.popleft(), queue.to_list()
+        ('a', ['b', 'c'])
+    """
+
+    def __init__(self, capacity=16):
+        self.items = [None] * capacity
+        self.next = array('q', [-1]) * capacity
+        self.head = self.tail = -1
+        self.size = 0
+        self._free_list(0, capacity)
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Fills slots 0 to n-1 in order, so the list starts out contiguous"""
+        items = list(iterable)
+        pooled = cls(capacity=max(len(items), 1))
+        size = len(items)
+        if size:
+            pooled.items[:size] = items
+            pooled.next = array('q', range(1, size + 1))
+            pooled.next[-1] = -1
+            pooled.head, pooled.tail, pooled.size = 0, size - 1, size
+            pooled.free = -1
+        return pooled
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __iter__(self):
+        return self.return_all(lim=None)
+
+    def return_all(self, lim=100):
+        """Yields the first lim items, all of them if lim is None"""
+        items, next_slots = self.items, self.next
+        slot, i = self.head, 0
+        while slot != -1 and i != lim:
+            yield items[slot]
+            slot = next_slots[slot]
+            i += 1
+
+    def print_all(self, lim=100):
+        for item in self.return_all(lim):
+            print(item)
+
+    def to_list(self):
+        return list(self.return_all(lim=None))
+
+    def _free_list(self, start, stop):
+        """Chains slots start to stop-1 onto the free list"""
+        for slot in range(start, stop - 1):
+            self.next[slot] = slot + 1
+        if start < stop:
+            self.next[stop - 1] = -1
+        self.free = start if start < stop else -1
+
+    def _allocate(self, item):
+        if self.free == -1:
+            capacity = len(self.items)
+            extra = max(capacity, 16)
+            self.items.extend([None] * extra)
+            self.next.extend(array('q', [-1]) * extra)
+            self._free_list(capacity, capacity + extra)
+
+        slot = self.free
+        self.free = self.next[slot]
+        self.items[slot] = item
+        self.next[slot] = -1
+        return slot
+
+    def _release(self, slot):
+        self.items[slot] = None  # drop the reference
+        self.next[slot] = self.free
+        self.free = slot
+
+    def append(self, item):
+        slot = self._allocate(item)
+        if self.tail == -1:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+        self.tail = slot
+        self.size += 1
+
+    def push(self, item):
+        slot = self._allocate(item)
+        self.next[slot] = self.head
+        self.head = slot
+        if self.tail == -1:
+            self.tail = slot
+        self.size += 1
+
+    appendleft = push
+
+    def peek(self):
+        if self.head == -1:
+            raise EmptyListError("list is empty")
+        return self.items[self.head]
+
+    def popleft(self):
+        if self.head == -1:
+            raise EmptyListError("list is empty")
+
+        slot = self.head
+        item = self.items[slot]
+        self.head = self.next[slot]
+        if self.head == -1:
+            self.tail = -1
+        self._release(slot)
+        self.size -= 1
+        return item
+
+    def remove(self, item):
+        """Removes the first slot holding item"""
+        prev_slot, slot = -1, self.head
+        while slot != -1:
+            if self.items[slot] == item:
+                next_slot = self.next[slot]
+                if prev_slot == -1:
+                    self.head = next_slot
+                else:
+                    self.next[prev_slot] = next_slot
+                if slot == self.tail:
+                    self.tail = prev_slot
+                self._release(slot)
+                self.size -= 1
+                return None
+            prev_slot, slot = slot, self.next[slot]
+
+        raise ItemNotFoundError(f"{item} not found")
+
+    def remove_all(self):
+        capacity = len(self.items)
+        self.items = [None] * capacity
+        self.head = self.tail = -1
+        self.size = 0
+        self._free_list(0, capacity)
+
+
+class BlockingQueue:
+    """
+    | Bounded FIFO queue for producer/consumer threads, stored in a PooledLinkedList
+    | Drop-in for queue.Queue's put, get, qsize, empty and full, raises queue.Empty and queue.Full
+    | maxsize <= 0 means unbounded
+
+    | put_many and get_many move a batch under one lock acquisition,
+    | so consumers that drain in batches hand the lock back and forth far less often
+
+    .. code-block:: python
+
+        >>> queue = BlockingQueue(maxsize=1000)
+        >>> queue.put_many(range(5))
+        >>> queue.get(), queue.get_many(10, timeout=1)
+        (0, [1, 2, 3, 4])
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self.listeners = []  # called with the lock held after every put or get, see AsyncQueue
+        self._init()
+
+    def __len__(self):
+        return self.qsize()
+
+    def qsize(self):
+        with self.mutex:
+            return self._qsize()
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def full(self):
+        with self.mutex:
+            return 0 < self.maxsize <= self._qsize()
+
+    def put(self, item, block=True, timeout=None):
+        """Waits up to timeout seconds for room if block, raises queue.Full if there is none"""
+        with self.not_full:
+            if 0 < self.maxsize <= self.items.size:
+                self._wait(self.not_full, self._has_room, block, timeout, Full)
+            self._put(item)
+            self.not_empty.notify()
+            self._changed()
+
+    def get(self, block=True, timeout=None):
+        """Waits up to timeout seconds for an item if block, raises queue.Empty if there is none"""
+        with self.not_empty:
+            if not self.items.size:
+                self._wait(self.not_empty, self._qsize, block, timeout, Empty)
+            item = self._get()
+            self.not_full.notify()
+            self._changed()
+        return item
+
+    def put_many(self, items, block=True, timeout=None):
+        """
+        | Puts every item, as many as fit per lock acquisition
+        | timeout is for the whole batch, on queue.Full the items already put stay in the queue
+        """
+        items = iter(items)
+        pending = next(items, _END)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while pending is not _END:
+            with self.not_full:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+                self._wait(self.not_full, self._has_room, block, remaining, Full)
+                added = 0
+                while pending is not _END and self._has_room():
+                    self._put(pending)
+                    added += 1
+                    pending = next(items, _END)
+                self.not_empty.notify(added)
+                self._changed()
+
+    def get_many(self, n, block=True, timeout=None):
+        """
+        | Waits for at least one item like get, then returns up to n items without waiting for more
+        """
+        with self.not_empty:
+            self._wait(self.not_empty, self._qsize, block, timeout, Empty)
+            items = [self._get() for _ in range(min(n, self._qsize()))]
+            self.not_full.notify(len(items))
+            self._changed()
+        return items
+
+    def _put_with(self, put, item, block, timeout):
+        with self.not_full:
+            self._wait(self.not_full, self._has_room, block, timeout, Full)
+            put(item)
+            self.not_empty.notify()
+            self._changed()
+
+    def _get_with(self, get, block, timeout):
+        with self.not_empty:
+            self._wait(self.not_empty, self._qsize, block, timeout, Empty)
+            item = get()
+            self.not_full.notify()
+            self._changed()
+        return item
+
+    def _changed(self):
+        for listener in self.listeners:
+            listener()
+
+    @staticmethod
+    def _wait(condition, predicate, block, timeout, error):
+        """Called with the lock held, raises error if predicate is still false after timeout"""
+        if predicate():
+            return None
+        if not block or not condition.wait_for(predicate, timeout):
+            raise error
+
+    def _has_room(self):
+        return self.maxsize <= 0 or self._qsize() < self.maxsize
+
+    # storage, BlockingDeque overrides these
+
+    def _init(self):
+        self.items = PooledLinkedList()
+
+    def _qsize(self):
+        return self.items.size
+
+    def _put(self, item):
+        self.items.append(item)
+
+    def _get(self):
+        return self.items.popleft()
+
+
+class BlockingDeque(BlockingQueue):
+    """
+    | BlockingQueue that can also put at the front and get from the back, stored in a DoublyLinkedList
+    | put and get are FIFO, put_left and get_right work at the other ends
+
+    .. code-block:: python
+
+        >>> deque = BlockingDeque(maxsize=10)
+        >>> deque.put('a'); deque.put('b'); deque.put_left('urgent')
+        >>> deque.get(), deque.get_right()
+        ('urgent', 'b')
+    """
+
+    def put_left(self, item, block=True, timeout=None):
+        self._put_with(self._put_left, item, block, timeout)
+
+    def get_right(self, block=True, timeout=None):
+        return self._get_with(self._get_right, block, timeout)
+
+    def _init(self):
+        self.items = DoublyLinkedList()
+
+    def _put(self, item):
+        self.items.append(DoublyNode(item))
+
+    def _put_left(self, item):
+        self.items.push(DoublyNode(item))
+
+    def _get(self):
+        return self.items.popleft().data
+
+    def _get_right(self):
+        return self.items.pop().data
+
+
+class AsyncQueue:
+    """
+    | asyncio wrapper around a BlockingQueue or BlockingDeque, so coroutines and threads can share one queue
+    | Every attempt is non-blocking and runs on the event loop, no executor threads are used
+    | When an attempt fails the coroutine waits on a future, the queue resolves it through
+    | loop.call_soon_threadsafe after its next put or get, then the attempt is retried
+    | A cancelled or timed out coroutine never takes an item, it only stops waiting
+    | Timeouts raise queue.Empty and queue.Full like the wrapped queue
+
+    .. code-block:: python
+
+        >>> queue = AsyncQueue(BlockingQueue(maxsize=1000))
+        >>> threading.Thread(target=lambda: queue.queue.put_many(range(10))).start()
+        >>> await queue.get_many(100, timeout=5)
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else BlockingQueue()
+        self.loop = None
+        self.waiters = []
+        self.queue.listeners.append(self._wake)
+
+    def __len__(self):
+        return self.queue.qsize()
+
+    def qsize(self):
+        return self.queue.qsize()
+
+    async def put(self, item, timeout=None):
+        await self._retry(lambda: self.queue.put(item, block=False), Full, timeout)
+
+    async def get(self, timeout=None):
+        return await self._retry(lambda: self.queue.get(block=False), Empty, timeout)
+
+    async def put_many(self, items, timeout=None):
+        """Puts the items one at a time, waiting for room as needed, timeout is for the whole batch"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for item in items:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            await self.put(item, remaining)
+
+    async def get_many(self, n, timeout=None):
+        return await self._retry(lambda: self.queue.get_many(n, block=False), Empty, timeout)
+
+    async def _retry(self, attempt, error, timeout):
+        """Runs attempt until it doesn't raise error, waiting for the queue to change in between"""
+        loop = asyncio.get_running_loop()
+        self.loop = loop
+        deadline = None if timeout is None else loop.time() + timeout
+
+        while True:
+            # register before trying, so a change between the attempt and the wait isn't missed
+            waiter = loop.create_future()
+            self.waiters.append(waiter)
+            try:
+                try:
+                    return attempt()
+                except error:
+                    pass
+
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise error
+                try:
+                    await asyncio.wait_for(waiter, remaining)
+                except asyncio.TimeoutError:
+                    raise error from None
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+
+    def _wake(self):
+        """Queue listener, may run on any thread"""
+        loop = self.loop
+        if loop is not None and self.waiters and not loop.is_closed():
+            loop.call_soon_threadsafe(self._resolve_waiters)
+
+    def _resolve_waiters(self):
+        waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+_END = object()
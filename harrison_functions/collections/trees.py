@@ -1,5 +1,8 @@
-from collections import defaultdict, deque
+from collections import deque
+from itertools import islice
+import numpy as np
 from .custom_errors import MethodNotFoundError, ItemNotFoundError
+from .heap import MaxHeap
 from ..utils.std.list import peek
 
 # Functions
@@ -8,18 +11,25 @@ from ..utils.std.list import peek
 # # binary_tree_from_array
 # # binary_heap_from_array
 # # binary_search_intervals
+# # bucket_ids
 # # bucketer
 
 # Classes
 # # Node
+# # TraversalMixin
 # # BinaryTree
 # # BinaryHeap
+# # AVLNode
+# # AVLTree
+# # CompactTree
+# # IntervalIndex
 
 
-def balanced_root_from_sorted_array(array):
+def balanced_root_from_sorted_array(array, start=0, stop=None):
     """
     | Returns the root of a tree constructed from a sorted array
-    | Recursively and manually set the links
+    | Builds array[start:stop] iteratively over index ranges, so nothing is sliced or copied
+    | The middle of each range becomes the node, O(n)
     
       .. code-block:: python
             
@@ -32,18 +42,25 @@ def balanced_root_from_sorted_array(array):
              1    3   5    7
 
     """
-    length = len(array)
-    
-    if length == 0:
+    stop = len(array) if stop is None else stop
+    if start >= stop:
         return None
-    
-    mid = int(length/2)
-    
-    node = Node(array[mid])
-    node.left = balanced_root_from_sorted_array(array[:mid])
-    node.right = balanced_root_from_sorted_array(array[mid+1:])
 
-    return node
+    root = Node()
+    stack = [(start, stop, root)]
+    while stack:
+        lo, hi, node = stack.pop()
+        mid = (lo + hi) // 2
+        node.data = array[mid]
+
+        if lo < mid:
+            node.left = Node()
+            stack.append((lo, mid, node.left))
+        if mid + 1 < hi:
+            node.right = Node()
+            stack.append((mid + 1, hi, node.right))
+
+    return root
 
 
 def balanced_tree_from_sorted_array(array):
@@ -54,6 +71,10 @@ def balanced_tree_from_sorted_array(array):
 
 
 def binary_tree_from_array(array):
+    """
+    | Inserts one node at a time, the shape depends on the order of array
+    | Use BinaryTree.from_unsorted for a balanced tree
+    """
     tree = BinaryTree(Node(array[0]))
     for item in array[1:]:
         tree.insert(Node(item))
@@ -71,6 +92,7 @@ def binary_search_intervals(node, data):
     """
     | Search a binary tree of intervals
     | Use with create_intervals and balanced_tree_from_sorted_array
+    | Raises for values outside every interval, use IntervalIndex.locate for batches
     
       .. code-block:: text
 
@@ -95,11 +117,32 @@ def binary_search_intervals(node, data):
     return node
 
 
+def bucket_ids(array, intervals):
+    """
+    | Returns the index of the interval [start, stop) containing each value, or -1
+    | Builds an IntervalIndex, pass one in to reuse it across batches
+    | Intervals can overlap, have gaps and non-uniform widths
+
+       .. code-block:: python
+
+          >>> bucket_ids([64, 34, 25, 12, 22, 11, 90, 110],
+                         [(0, 25.0), (25.0, 50.0), (50.0, 75.0), (75.0, 100.0)])
+
+          array([ 2,  1,  1,  0,  0,  0,  3, -1])
+    """
+    if not isinstance(intervals, IntervalIndex):
+        intervals = IntervalIndex(intervals)
+
+    return intervals.locate(np.asarray(array))
+
+
 def bucketer(array, intervals):
     """
     | Sorts a list into a list of lists based on intervals, remainders are dropped
-    | Use with create_intervals
-    
+    | Use with create_intervals, or pass an IntervalIndex to reuse it
+    | Bucket ids come from bucket_ids, then a stable argsort groups the items
+    | NumPy inputs return a list of arrays
+
        .. code-block:: python
 
           >>> bucketer([64, 34, 25, 12, 22, 11, 90],
@@ -108,224 +151,136 @@ def bucketer(array, intervals):
           [[12, 22, 11], [34, 25], [64], [90]]
     """
 
-    num_intervals = len(intervals) 
-    interval_to_idx = defaultdict(dict)
-    for idx, interval in enumerate(intervals):
-        interval_to_idx[interval] = idx    
-    
-    tree = balanced_tree_from_sorted_array(intervals)
-    
-    # using buckets = [[]] * num_intervals causes an error
-    buckets = []
-    for bucket in range(num_intervals):
-        buckets.append([])
-    
-    for num in array:
-        try:
-            interval = binary_search_intervals(tree.root, num).data
-            buckets[interval_to_idx[interval]].append(num)
-        except ItemNotFoundError:
-            pass  # drop remainders
+    num_intervals = len(intervals)
+    ids = bucket_ids(array, intervals)
+
+    if num_intervals < 2**15:
+        ids = ids.astype(np.int16)  # numpy uses radix sort for stable argsort of 16-bit ints
+    order = np.argsort(ids, kind='stable')
+    bounds = np.cumsum(np.bincount(ids + 1, minlength=num_intervals + 1)).tolist()
 
-    return buckets
+    if isinstance(array, np.ndarray):
+        values = array[order]
+        return [values[bounds[i]:bounds[i + 1]] for i in range(num_intervals)]
+
+    order = order.tolist()
+    return [[array[idx] for idx in order[bounds[i]:bounds[i + 1]]] for i in range(num_intervals)]
 
 
 class Node:
+    __slots__ = ('data', 'left', 'right')
+
     def __init__(self, data=None):
         self.data = data
         self.left = None
         self.right = None
 
 
-class BinaryTree:
+class TraversalMixin:
     """
-    | Make sure to only add Node objects to the Binary Tree
+    | Traversals shared by BinaryTree and BinaryHeap, none of them recurse
+    | Deep or degenerate trees don't hit the recursion limit,
+    | and each node is yielded in O(1) instead of through a chain of generators
 
-    | Examples:
-    
-    #. | Using insert only
-       | source: https://www.tutorialspoint.com/python_data_structure/python_tree_traversal_algorithms.htm
-       
-       .. code-block:: python
+    | Methods:
 
-                   27
-                 /    \\
-               14      35
-              /  \\    /  \\
-            10   19  31  42
-            
-            tree = BinaryTree(Node(27))
-            tree.insert(Node(14))
-            tree.insert(Node(35))
-            tree.insert(Node(10))
-            tree.insert(Node(19))
-            tree.insert(Node(31))
-            tree.insert(Node(42))
-    
-    #. | Impossible with insert only
-       | source: https://www.section.io/engineering-education/binary-tree-data-structure-python/
+    #. iterative, explicit stack, the default
+    #. morris, threads the tree temporarily so it uses O(1) extra space, inorder and preorder only
+    #. recursive, kept for compatibility, runs the iterative traversals
 
-       .. code-block:: python
-  
-                   10
-                 /    \\
-               34      89
-              /  \\    /  \\
-            20   45  56  54
-        
-          tree = BinaryTree(Node(10))
-          tree.root.left = Node(34)
-          tree.root.right = Node(89)
-          tree.root.left.left = Node(20)
-          tree.root.left.right = Node(45)
-          tree.root.right.left = Node(56)
-          tree.root.right.right = Node(54)
+    | Use traverse(order, method) to pick one, only the chosen generator is built
     """
-    
-    def __init__(self, root=None):
-        self.root = root
-        self.current = self.root
-    
-    def get_current(self):
-        return self.current.data
-    
-    def move_left(self):
-        self.current = self.current.left
-        return self.current.data
-    
-    def move_right(self):
-        self.current = self.current.right
-        return self.current.data
-    
-    def reset(self):
-        self.current = self.root
-        return self.root.data
-        
-    def __insert(self, node, new_node):
-        """
-        | Traverse down the tree, insert at first open position
-        | Inserts in level order
-        | This is breadth first, all the tree traversals are depth first
-        """
-        
-        if new_node.data < node.data:
-            if node.left is None:
-                node.left = new_node
-            else:
-                self.__insert(node.left, new_node)
 
-        elif new_node.data > node.data:
-            if node.right is None:
-                node.right = new_node
-            else:
-                self.__insert(node.right, new_node)
-            
-    def insert(self, new_node):
-        """level order insert
-        """
-        if self.root.data is None:
-            self.root = new_node
-        else:
-            self.__insert(self.root, new_node)
-           
-    def count_leaf_nodes(self, node='default'):
-        """recursive count
+    def traverse(self, order='inorder', method='iterative'):
         """
-        if node=='default':
-            node = self.root
-        
-        if node is None:
-            return 0
-        if(node.left is None and node.right is None):
-            return 1
-        else: 
-            return self.count_leaf_nodes(node.left) + self.count_leaf_nodes(node.right)
-            
-    def iterative_levelorder(self, node='default'):
-        """Add current level elements to stack and pop them to return
+        | Valid options:
+        | order: ['inorder', 'rev_inorder', 'preorder', 'postorder', 'levelorder']
+        | method: ['iterative', 'recursive', 'morris']
         """
-        
-        stack = deque()
-        stack.append(self.root)
+        traversals = {'iterative': {'inorder': self.iterative_inorder,
+                                    'rev_inorder': self.iterative_rev_inorder,
+                                    'preorder': self.iterative_preorder,
+                                    'postorder': self.iterative_postorder,
+                                    'levelorder': self.iterative_levelorder},
+                      'recursive': {'inorder': self.recursive_inorder,
+                                    'rev_inorder': self.recursive_rev_inorder,
+                                    'preorder': self.recursive_preorder,
+                                    'postorder': self.recursive_postorder},
+                      'morris': {'inorder': self.morris_inorder,
+                                 'preorder': self.morris_preorder}}
 
-        while stack:
-            node = stack.popleft()
-            yield node
+        traversal = traversals.get(method, {}).get(order)
+        if traversal is None:
+            raise MethodNotFoundError(f"Please check your inputs: order='{order}', method='{method}'")
 
-            if node.left is not None:
-                stack.append(node.left)
+        return traversal()
 
-            if node.right is not None:
-                stack.append(node.right)
-    
-    def recursive_inorder(self, node='default'):
-        """
-        | traverse recursively
-        | left -> root -> right
+    def to_array(self, order='inorder', dtype=np.float64, size=None, method='iterative'):
         """
-        
-        if node=='default':
-            node = self.root
+        | Writes the data of every node into a NumPy array, in the given order
+        | Pass size when the number of nodes is known, the array is then allocated once
+        | Otherwise np.fromiter grows it as it goes
 
-        if node.left:
-            yield from self.recursive_inorder(node.left)
-            
-        yield node
-        
-        if node.right:
-            yield from self.recursive_inorder(node.right)
+        .. code-block:: python
 
-    def recursive_rev_inorder(self, node='default'):
-        """
-        | traverse recursively
-        | right -> root -> left
-        """
-        
-        if node=='default':
-            node = self.root
-        
-        if node.right:
-            yield from self.recursive_rev_inorder(node.right)
-            
-        yield node
-        
-        if node.left:
-            yield from self.recursive_rev_inorder(node.left)
-            
-    def recursive_postorder(self, node='default'):
+            >>> tree = balanced_tree_from_sorted_array([10, 14, 19, 27, 31, 35, 42])
+            >>> tree.to_array('preorder', dtype=np.int64, size=7)
+            array([27, 14, 10, 19, 35, 31, 42])
         """
-        | traverse recursively
-        | left -> right -> root
+        return np.fromiter((node.data for node in self.traverse(order, method)),
+                           dtype=dtype, count=-1 if size is None else size)
+
+    def save(self, path, dtype=None):
         """
-        
-        if node=='default':
-            node = self.root
-        
-        if node.left:
-            yield from self.recursive_postorder(node.left)
-        
-        if node.right:
-            yield from self.recursive_postorder(node.right)
-            
-        yield node
-        
-    def recursive_preorder(self, node='default'):
+        | Saves the tree through CompactTree.save, no pickling so depth doesn't matter
+        | Use CompactTree.load(path) in workers to memory-map it without building Nodes
+        | The dtype is inferred from the keys, a given dtype must hold every key exactly
+        | Only numeric keys can be saved, object and str keys raise a TypeError
         """
-        | traverse recursively
-        | root -> left -> right
+        keys = np.asarray([node.data for node in self.iterative_levelorder()])
+        if keys.dtype.kind in 'OUS':
+            raise TypeError(f"can't save keys of dtype {keys.dtype}, only numeric keys are supported")
+
+        if dtype is not None:
+            cast = keys.astype(dtype)
+            if not np.array_equal(cast.astype(keys.dtype), keys):
+                raise ValueError(f"dtype {np.dtype(dtype)} can't hold every key of dtype {keys.dtype} exactly")
+            keys = cast
+
+        CompactTree.from_tree(self, dtype=keys.dtype).save(path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Rebuilds the Nodes from a file written by save, O(n)"""
+        return CompactTree.load(path, mmap=mmap).to_tree(tree_class=cls)
+
+    def count_leaf_nodes(self, node='default'):
+        """iterative count
         """
+        return sum(1 for node in self.iterative_preorder(node)
+                   if node.left is None and node.right is None)
 
+    def iterative_levelorder(self, node='default'):
+        """Add current level elements to a queue and pop them to return
+        """
         if node=='default':
             node = self.root
-            
-        yield node
-        
-        if node.left:
-            yield from self.recursive_preorder(node.left)
-        
-        if node.right:
-            yield from self.recursive_preorder(node.right)
-    
+        if node is None:
+            return None
+
+        queue = deque()
+        queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            yield node
+
+            if node.left is not None:
+                queue.append(node.left)
+
+            if node.right is not None:
+                queue.append(node.right)
+
     def iterative_inorder(self, node='default'):
         """
         | See: https://www.geeksforgeeks.org/inorder-tree-traversal-without-recursion/
@@ -354,7 +309,7 @@ class BinaryTree:
         if node=='default':
             node = self.root
             
-        stack = deque()
+        stack = []
         
         while True:
             # during first loop, adds all left nodes to stack
@@ -371,13 +326,36 @@ class BinaryTree:
             else:
                 break
     
+    def iterative_rev_inorder(self, node='default'):
+        """
+        | Same as iterative_inorder with left and right swapped
+        | right -> root -> left
+        """
+        if node=='default':
+            node = self.root
+
+        stack = []
+
+        while True:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+
+            if not stack:
+                break
+
+            node = stack.pop()
+            yield node
+            node = node.left
+
     def iterative_preorder(self, node='default'):
         
         if node=='default':
             node = self.root
+        if node is None:
+            return None
             
-        stack = deque()
-        stack.append(node)
+        stack = [node]
         
         while stack:
             node = stack.pop()
@@ -393,8 +371,10 @@ class BinaryTree:
         
         if node=='default':
             node = self.root
+        if node is None:
+            return None
             
-        stack = deque()
+        stack = []
         
         while True:
             while node:
@@ -416,73 +396,324 @@ class BinaryTree:
                 node = None
                 
             if not stack:
-                break            
-            
-    def print_tree(self, method='recursive', order='inorder'):
+                break
+
+    def morris_inorder(self, node='default'):
         """
-        | Valid options:
-        | order: ['inorder', 'preorder', 'postorder']
-        | method: ['recursive', 'iterative']
+        | Morris traversal, O(1) extra space
+        | left -> root -> right
+        | Each node's inorder predecessor temporarily points back to it instead of using a stack
+        | The links are removed as the walk goes, and if the loop stops early the rest of the walk
+        | still runs when the generator is closed, so the tree is always restored
+        | Don't modify or traverse the tree from another thread during the walk
         """
-        
-        traverse = {'recursive': {'inorder': self.recursive_inorder(),
-                                  'preorder': self.recursive_preorder(),
-                                  'postorder': self.recursive_postorder(),},
-                    'iterative': {'inorder': self.iterative_inorder(),
-                                  'preorder': self.iterative_preorder(),
-                                  'postorder': self.iterative_postorder(),
-                                  'levelorder': self.iterative_levelorder(),}}
-        
-        if traverse.get(method, {}).get(order) is None:
-            raise MethodNotFoundError(f"Please check your inputs: order='{order}', method='{method}'")
+        if node=='default':
+            node = self.root
 
-        for node in traverse[method][order]:
-            print(node.data)
-            
-    def print_leaf_nodes(self, order='left_to_right'):
-        if order=='left_to_right':
-            for node in self.recursive_inorder():
-                if (node.left is None and node.right is None):
-                    print(node.data)
-                    
-        elif order=='right_to_left':
-            for node in self.recursive_rev_inorder():
-                if (node.left is None and node.right is None):
-                    print(node.data)
-                    
-        else:
-            raise MethodNotFoundError(f"Please check your input: order='{order}'")
-        
-    def search(self, data, order='levelorder'):
-        """Iterative search, this is bad for binary search trees"""
-        
-        traverse = {'levelorder': self.iterative_levelorder(),
-                    'inorder': self.recursive_inorder(),
-                    'preorder': self.recursive_preorder(),
-                    'postorder': self.recursive_postorder()}
-        
-        if traverse.get(order) is None:
-            raise MethodNotFoundError(f"Please check your inputs: method='{method}'")
-        
-        for node in traverse[order]:
-            if node.data == data:
-                return node
+        walk = self._morris_walk(node, preorder=False)
+        try:
+            for node in walk:
+                yield node
+        finally:
+            for _ in walk:
+                pass
 
-        return print("Not found")
+    def morris_preorder(self, node='default'):
+        """
+        | Morris traversal, O(1) extra space, see morris_inorder
+        | root -> left -> right
+        """
+        if node=='default':
+            node = self.root
 
-    def binary_search(self, data):
-        """ """
+        walk = self._morris_walk(node, preorder=True)
+        try:
+            for node in walk:
+                yield node
+        finally:
+            for _ in walk:
+                pass
 
-        return node
+    @staticmethod
+    def _morris_walk(node, preorder):
+        while node is not None:
+            if node.left is None:
+                yield node
+                node = node.right
+                continue
 
+            predecessor = node.left
+            while predecessor.right is not None and predecessor.right is not node:
+                predecessor = predecessor.right
 
-class BinaryHeap:
-    """
-    | Make sure to only add Node objects to the Binary Heap
-    | Examples:
-    
-    #. | Using insert only
-       | source: https://www.tutorialspoint.com/python_data_structure/python_tree_traversal_algorithms.htm
+            if predecessor.right is None:
+                # first visit, thread the predecessor back to node and go left
+                if preorder:
+                    yield node
+                predecessor.right = node
+                node = node.left
+            else:
+                # second visit, the left subtree is done
+                predecessor.right = None
+                if not preorder:
+                    yield node
+                node = node.right
+
+    def recursive_inorder(self, node='default'):
+        """
+        | left -> root -> right
+        | Kept for compatibility, runs iterative_inorder
+        """
+        return self.iterative_inorder(node)
+
+    def recursive_rev_inorder(self, node='default'):
+        """
+        | right -> root -> left
+        | Kept for compatibility, runs iterative_rev_inorder
+        """
+        return self.iterative_rev_inorder(node)
+
+    def recursive_postorder(self, node='default'):
+        """
+        | left -> right -> root
+        | Kept for compatibility, runs iterative_postorder
+        """
+        return self.iterative_postorder(node)
+
+    def recursive_preorder(self, node='default'):
+        """
+        | root -> left -> right
+        | Kept for compatibility, runs iterative_preorder
+        """
+        return self.iterative_preorder(node)
+
+
+class BinaryTree(TraversalMixin):
+    """
+    | Make sure to only add Node objects to the Binary Tree
+
+    | Examples:
+    
+    #. | Using insert only
+       | source: https://www.tutorialspoint.com/python_data_structure/python_tree_traversal_algorithms.htm
+       
+       .. code-block:: python
+
+                   27
+                 /    \\
+               14      35
+              /  \\    /  \\
+            10   19  31  42
+            
+            tree = BinaryTree(Node(27))
+            tree.insert(Node(14))
+            tree.insert(Node(35))
+            tree.insert(Node(10))
+            tree.insert(Node(19))
+            tree.insert(Node(31))
+            tree.insert(Node(42))
+    
+    #. | Impossible with insert only
+       | source: https://www.section.io/engineering-education/binary-tree-data-structure-python/
+
+       .. code-block:: python
+  
+                   10
+                 /    \\
+               34      89
+              /  \\    /  \\
+            20   45  56  54
+        
+          tree = BinaryTree(Node(10))
+          tree.root.left = Node(34)
+          tree.root.right = Node(89)
+          tree.root.left.left = Node(20)
+          tree.root.left.right = Node(45)
+          tree.root.right.left = Node(56)
+          tree.root.right.right = Node(54)
+    """
+    
+    def __init__(self, root=None):
+        self.root = root
+        self.current = self.root
+
+    @classmethod
+    def from_sorted(cls, array):
+        """Bulk-loads a balanced tree from sorted data in O(n), see balanced_root_from_sorted_array"""
+        return cls(balanced_root_from_sorted_array(array))
+
+    @classmethod
+    def from_unsorted(cls, iterable):
+        """
+        | Sorts, drops duplicates like insert does, then bulk-loads a balanced tree
+        | O(n log n) for the sort, O(n) for the build
+        """
+        array = sorted(iterable)
+        unique = [item for i, item in enumerate(array) if i == 0 or array[i - 1] < item]
+        return cls.from_sorted(unique)
+    
+    def get_current(self):
+        return self.current.data
+    
+    def move_left(self):
+        self.current = self.current.left
+        return self.current.data
+    
+    def move_right(self):
+        self.current = self.current.right
+        return self.current.data
+    
+    def reset(self):
+        self.current = self.root
+        return self.root.data
+        
+    def __insert(self, node, new_node):
+        """
+        | Traverse down the tree, insert at first open position
+        | Iterative, so sorted input doesn't hit the recursion limit
+        | Duplicates are dropped, use AVLTree to keep counts
+        """
+        
+        while True:
+            if new_node.data < node.data:
+                if node.left is None:
+                    node.left = new_node
+                    return None
+                node = node.left
+
+            elif new_node.data > node.data:
+                if node.right is None:
+                    node.right = new_node
+                    return None
+                node = node.right
+
+            else:
+                return None
+            
+    def insert(self, new_node):
+        """level order insert
+        """
+        if self.root.data is None:
+            self.root = new_node
+        else:
+            self.__insert(self.root, new_node)
+           
+    def print_tree(self, method='recursive', order='inorder'):
+        """
+        | Valid options:
+        | order: ['inorder', 'rev_inorder', 'preorder', 'postorder', 'levelorder']
+        | method: ['recursive', 'iterative', 'morris']
+        | Only the chosen traversal is built, see traverse
+        """
+
+        for node in self.traverse(order, method):
+            print(node.data)
+            
+    def print_leaf_nodes(self, order='left_to_right'):
+        if order=='left_to_right':
+            for node in self.recursive_inorder():
+                if (node.left is None and node.right is None):
+                    print(node.data)
+                    
+        elif order=='right_to_left':
+            for node in self.recursive_rev_inorder():
+                if (node.left is None and node.right is None):
+                    print(node.data)
+                    
+        else:
+            raise MethodNotFoundError(f"Please check your input: order='{order}'")
+        
+    def search(self, data, order='levelorder'):
+        """
+        | Searches every node in the given order, use binary_search for binary search trees
+        | Only the requested traversal is built
+        """
+        
+        traverse = {'levelorder': self.iterative_levelorder,
+                    'inorder': self.recursive_inorder,
+                    'preorder': self.recursive_preorder,
+                    'postorder': self.recursive_postorder}
+        
+        if traverse.get(order) is None:
+            raise MethodNotFoundError(f"Please check your input: order='{order}'")
+        
+        for node in traverse[order]():
+            if node.data == data:
+                return node
+
+        return print("Not found")
+
+    def binary_search(self, data):
+        """
+        | Walks down from the root, O(log n) on a balanced binary search tree
+        | Returns the node holding data, or None
+        """
+
+        node = self.root
+        while node is not None:
+            if data < node.data:
+                node = node.left
+            elif data > node.data:
+                node = node.right
+            else:
+                return node
+
+        return None
+
+    def contains(self, data):
+        return self.binary_search(data) is not None
+
+    def search_many(self, sorted_keys):
+        """
+        | Looks up a batch of ascending keys in one walk of a binary search tree
+        | Keeps the path of the last lookup with the upper bound of each subtree,
+        | the next key only climbs to the lowest subtree that can hold it, then descends
+        | Returns a list of nodes aligned with sorted_keys, None where a key is missing
+
+        .. code-block:: python
+
+            >>> tree = balanced_tree_from_sorted_array([10, 14, 19, 27, 31, 35, 42])
+            >>> [node.data if node else None for node in tree.search_many([10, 11, 35, 42])]
+            [10, None, 35, 42]
+        """
+
+        results = []
+        if self.root is None:
+            return [None] * len(sorted_keys)
+
+        path = [(self.root, None)]  # (node, upper bound of its subtree)
+        previous = None
+        for key in sorted_keys:
+            if previous is not None and key < previous:
+                raise ValueError(f"sorted_keys must be ascending, got {key} after {previous}")
+            previous = key
+
+            while path[-1][1] is not None and not key < path[-1][1]:
+                path.pop()
+
+            node, upper = path[-1]
+            while node is not None:
+                if key < node.data:
+                    upper, node = node.data, node.left
+                elif key > node.data:
+                    node = node.right
+                else:
+                    break
+                if node is not None:
+                    path.append((node, upper))
+
+            results.append(node)
+
+        return results
+
+
+class BinaryHeap(TraversalMixin):
+    """
+    | Make sure to only add Node objects to the Binary Heap
+    | Examples:
+    
+    #. | Using insert only
+       | source: https://www.tutorialspoint.com/python_data_structure/python_tree_traversal_algorithms.htm
        
          .. code-block:: python
    
@@ -525,51 +756,20 @@ class BinaryHeap:
 
     def heapsort(self):
         """
-        | Only swaps one-layer deep
-        | Traverses from bottom up in postorder
-        
-        | In the future: try to recurse down and place the new node at the right spot
-        | For now, can just keep rerunning this, it will eventually sort itself
+        | Rearranges the data so every node is larger than its children,
+        | then returns the data sorted from smallest to largest
+        | insert fills the tree in level order, so the nodes in level order
+        | line up with a flat heap array, see MaxHeap
         """
-        
-        for curr_node in self.recursive_postorder():
-            try:
-                print(curr_node.data, prev_node.data)
-            except:
-                print(curr_node.data, None)
-            
-            max_node = max([node for node in [curr_node, curr_node.left, curr_node.right] if node is not None],
-                           key=attrgetter("data"))
-            
-            if max_node == curr_node.left:
-                
-                parent_node = self.find_parent(curr_node)
-                if parent_node:
-                    if parent_node.left == curr_node:
-                        parent_node.left = curr_node.left
-                    elif parent_node.right == curr_node:
-                        parent_node.right = curr_node.left
-
-                print('swap left', curr_node.data, curr_node.left.data)
-                self.swap(curr_node, curr_node.left)
-                    
-            elif max_node == curr_node.right:
-                
-                parent_node = self.find_parent(curr_node)
-                if parent_node:
-                    if parent_node.left == curr_node:
-                        parent_node.left = curr_node.right
-                    elif parent_node.right == curr_node:
-                        parent_node.right = curr_node.right
+        if self.root is None:
+            return []
 
-                print('swap right', curr_node.data, curr_node.right.data)
-                self.swap(curr_node, curr_node.right)
+        nodes = list(self.iterative_levelorder())
+        heap = MaxHeap.heapify([node.data for node in nodes], track_positions=False)
+        for node, data in zip(nodes, heap.priorities):
+            node.data = data
 
-            else:
-                pass
-                    
-            prev_node = curr_node            
-                    
+        return [heap.pop()[0] for _ in range(len(heap))][::-1]
 
     def insert(self, new_node):
         """
@@ -588,118 +788,704 @@ class BinaryHeap:
                 node.right = new_node
                 break
             
-    def recursive_inorder(self, node='default'):
+    def print_tree(self, order='inorder'):
+        """Prints the first 100 nodes"""
+        if order not in ('inorder', 'levelorder'):
+            return None
+
+        for node in islice(self.traverse(order), 100):
+            print(node.data)
+
+
+class AVLNode:
+    """
+    | Node of an AVLTree
+    | count holds duplicates, size is the number of items in the subtree including duplicates
+    """
+
+    __slots__ = ('data', 'left', 'right', 'height', 'count', 'size')
+
+    def __init__(self, data=None):
+        self.data = data
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.count = 1
+        self.size = 1
+
+
+class AVLTree:
+    """
+    | Self-balancing binary search tree, the heights of every node's subtrees differ by at most 1
+    | Duplicates are counted on their node instead of being dropped
+    | Every node tracks the size of its subtree, so rank and select are O(log n)
+    | All operations are iterative, so sorted input never hits the recursion limit
+
+    | Runtimes:
+
+    #. insert, delete, search, count, rank, select, floor, ceiling: O(log n)
+    #. range_query: O(log n + k) for k items returned
+    #. len: O(1)
+
+    .. code-block:: python
+
+        >>> tree = AVLTree([27, 14, 35, 10, 19, 31, 42, 14])
+        >>> tree.rank(19), tree.select(3), tree.floor(30), tree.ceiling(30)
+        (3, 19, 27, 31)
+        >>> list(tree.range_query(14, 31))
+        [14, 14, 19, 27]
+    """
+
+    def __init__(self, array=None):
+        self.root = None
+        if array is not None:
+            for item in array:
+                self.insert(item)
+
+    @classmethod
+    def from_sorted(cls, array):
         """
-        | traverse recursively
-        | left -> root -> right
+        | Bulk-loads sorted data in O(n), duplicates become counts
+        | Each node is the middle of an index range over the unique items,
+        | so its height is the bit length of the range and its size is a prefix sum of the counts
         """
-        
-        if node=='default':
-            node = self.root
+        tree = cls()
+        keys, counts = [], []
+        for item in array:
+            if keys and not keys[-1] < item:
+                counts[-1] += 1
+            else:
+                keys.append(item)
+                counts.append(1)
+        if not keys:
+            return tree
 
-        if node.left:
-            yield from self.recursive_inorder(node.left)
-            
-        yield node
-        
-        if node.right:
-            yield from self.recursive_inorder(node.right)
-            
-    def recursive_postorder(self, node='default'):
+        prefix = [0]
+        for count in counts:
+            prefix.append(prefix[-1] + count)
+
+        tree.root = AVLNode()
+        stack = [(0, len(keys), tree.root)]
+        while stack:
+            lo, hi, node = stack.pop()
+            mid = (lo + hi) // 2
+            node.data, node.count = keys[mid], counts[mid]
+            node.height = (hi - lo).bit_length()
+            node.size = prefix[hi] - prefix[lo]
+
+            if lo < mid:
+                node.left = AVLNode()
+                stack.append((lo, mid, node.left))
+            if mid + 1 < hi:
+                node.right = AVLNode()
+                stack.append((mid + 1, hi, node.right))
+
+        return tree
+
+    @classmethod
+    def from_unsorted(cls, iterable):
+        return cls.from_sorted(sorted(iterable))
+
+    def __len__(self):
+        return self.root.size if self.root else 0
+
+    def __contains__(self, data):
+        return self.search(data) is not None
+
+    def __iter__(self):
+        """In order, duplicates are repeated"""
+        stack, node = [], self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            for _ in range(node.count):
+                yield node.data
+            node = node.right
+
+    def search(self, data):
+        """Returns the node holding data, or None"""
+        node = self.root
+        while node is not None:
+            if data < node.data:
+                node = node.left
+            elif node.data < data:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def count(self, data):
+        node = self.search(data)
+        return node.count if node else 0
+
+    def insert(self, data):
+        """Walks down to data, increments its count or adds a leaf, then rebalances the path"""
+        if self.root is None:
+            self.root = AVLNode(data)
+            return None
+
+        path, node = [], self.root
+        while node is not None:
+            path.append(node)
+            if data < node.data:
+                node = node.left
+            elif node.data < data:
+                node = node.right
+            else:
+                node.count += 1
+                for parent in path:
+                    parent.size += 1
+                return None
+
+        parent = path[-1]
+        if data < parent.data:
+            parent.left = AVLNode(data)
+        else:
+            parent.right = AVLNode(data)
+
+        self._rebalance_path(path)
+
+    def delete(self, data):
         """
-        | traverse recursively
-        | left -> right -> root
+        | Decrements the count of data, removes the node when it reaches 0
+        | A node with two children takes the data of its successor, then the successor is removed
         """
-        
-        if node=='default':
-            node = self.root
-        
-        if node.left:
-            yield from self.recursive_postorder(node.left)
-        
-        if node.right:
-            yield from self.recursive_postorder(node.right)
-            
-        yield node
-        
-    def iterative_levelorder(self, node='default'):
+        path, node = [], self.root
+        while node is not None and (data < node.data or node.data < data):
+            path.append(node)
+            node = node.left if data < node.data else node.right
+
+        if node is None:
+            raise ItemNotFoundError(f"{data} not found")
+
+        if node.count > 1:
+            node.count -= 1
+            node.size -= 1
+            for parent in path:
+                parent.size -= 1
+            return None
+
+        if node.left is not None and node.right is not None:
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.data, node.count = successor.data, successor.count
+            node = successor
+
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self.root = child
+            return None
+
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+
+        self._rebalance_path(path)
+
+    def rank(self, data):
+        """Number of items smaller than data, same as bisect_left on the sorted items"""
+        rank, node = 0, self.root
+        while node is not None:
+            if data < node.data:
+                node = node.left
+            elif node.data < data:
+                rank += self._size(node.left) + node.count
+                node = node.right
+            else:
+                return rank + self._size(node.left)
+        return rank
+
+    def bisect_left(self, data):
+        return self.rank(data)
+
+    def bisect_right(self, data):
+        return self.rank(data) + self.count(data)
+
+    def select(self, k):
+        """Returns the kth smallest item, k starts at 0 and duplicates are counted"""
+        if not 0 <= k < len(self):
+            raise IndexError(f"k={k} out of range for tree of size {len(self)}")
+
+        node = self.root
+        while True:
+            left_size = self._size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k < left_size + node.count:
+                return node.data
+            else:
+                k -= left_size + node.count
+                node = node.right
+
+    def floor(self, data):
+        """Largest item <= data, or None"""
+        floor, node = None, self.root
+        while node is not None:
+            if data < node.data:
+                node = node.left
+            else:
+                floor = node.data
+                node = node.right
+        return floor
+
+    def ceiling(self, data):
+        """Smallest item >= data, or None"""
+        ceiling, node = None, self.root
+        while node is not None:
+            if node.data < data:
+                node = node.right
+            else:
+                ceiling = node.data
+                node = node.left
+        return ceiling
+
+    def range_query(self, start, stop):
+        """Yields the items in [start, stop) in order, skipping subtrees outside the range"""
+        stack, node = [], self.root
+        while stack or node is not None:
+            while node is not None:
+                if node.data < start:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if not node.data < stop:
+                break
+            for _ in range(node.count):
+                yield node.data
+            node = node.right
+
+    def min(self):
+        node = self.root
+        while node is not None and node.left is not None:
+            node = node.left
+        return node.data if node else None
+
+    def max(self):
+        node = self.root
+        while node is not None and node.right is not None:
+            node = node.right
+        return node.data if node else None
+
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    @staticmethod
+    def _size(node):
+        return node.size if node else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.size = node.count + self._size(node.left) + self._size(node.right)
+
+    def _rotate_right(self, node):
+        new_root = node.left
+        node.left, new_root.right = new_root.right, node
+        self._update(node)
+        self._update(new_root)
+        return new_root
+
+    def _rotate_left(self, node):
+        new_root = node.right
+        node.right, new_root.left = new_root.left, node
+        self._update(node)
+        self._update(new_root)
+        return new_root
+
+    def _rebalance(self, node):
+        """Updates node, rotates if it's unbalanced, returns the new root of the subtree"""
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+
+        return node
+
+    def _rebalance_path(self, path):
+        """Rebalances from the bottom of the path up to the root, relinking rotated subtrees"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            new_node = self._rebalance(node)
+            if new_node is node:
+                continue
+            if i == 0:
+                self.root = new_node
+            elif path[i - 1].left is node:
+                path[i - 1].left = new_node
+            else:
+                path[i - 1].right = new_node
+
+
+class CompactTree:
+    """
+    | Binary search tree stored as parallel NumPy columns instead of Node objects
+    | keys[i] is the data of node i, left[i] and right[i] are child indices, -1 for none
+    | Columns double when full, like the numpy backend of ArrayHeap
+    | Duplicates are dropped, same as BinaryTree.insert
+    | Traversals yield node indices, read keys[idx] for the data
+
+    | A Node costs 56 bytes plus its data, a CompactTree node is 16 bytes with float64 keys
+    | Use from_tree and to_tree to convert from and to a BinaryTree of Nodes
+
+    .. code-block:: python
+
+        >>> tree = CompactTree(dtype=np.int64)
+        >>> for data in [27, 14, 35, 10, 19, 31, 42]:
+        ...     tree.insert(data)
+        >>> tree.keys[list(tree.inorder())]
+        array([10, 14, 19, 27, 31, 35, 42])
+    """
+
+    def __init__(self, dtype=np.float64, capacity=16):
+        self.dtype = dtype
+        self.size = 0
+        self.root = -1
+        self.keys = np.empty(capacity, dtype=dtype)
+        self.left = np.full(capacity, -1, dtype=np.int32)
+        self.right = np.full(capacity, -1, dtype=np.int32)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, data):
+        return self.binary_search(data) != -1
+
+    def _grow(self):
+        extra = max(self.keys.size, 16)
+        self.keys = np.concatenate([self.keys, np.empty(extra, dtype=self.dtype)])
+        self.left = np.concatenate([self.left, np.full(extra, -1, dtype=np.int32)])
+        self.right = np.concatenate([self.right, np.full(extra, -1, dtype=np.int32)])
+
+    def add_node(self, data):
+        """Appends an unlinked node and returns its index"""
+        if self.size == self.keys.size:
+            self._grow()
+        idx = self.size
+        self.keys[idx] = data
+        self.left[idx] = self.right[idx] = -1
+        self.size += 1
+        return idx
+
+    def insert(self, data):
+        """Iterative insert, returns the index of the node holding data"""
+        if self.root == -1:
+            self.root = self.add_node(data)
+            return self.root
+
+        keys, idx = self.keys, self.root
+        while True:
+            if data < keys[idx]:
+                if self.left[idx] == -1:
+                    self.left[idx] = self.add_node(data)
+                    return self.left[idx]
+                idx = self.left[idx]
+            elif data > keys[idx]:
+                if self.right[idx] == -1:
+                    self.right[idx] = self.add_node(data)
+                    return self.right[idx]
+                idx = self.right[idx]
+            else:
+                return idx
+
+    def binary_search(self, data):
+        """Returns the index of the node holding data, or -1"""
+        keys, left, right = self.keys, self.left, self.right
+        idx = self.root
+        while idx != -1:
+            if data < keys[idx]:
+                idx = left[idx]
+            elif data > keys[idx]:
+                idx = right[idx]
+            else:
+                return idx
+        return -1
+
+    def _links(self):
         """
-        | traverse iteratively
-        | add current level elements to stack and pop them to return
+        | Zero-copy views of the child columns that index to plain ints
+        | tolist would allocate ~24 bytes per node on top of the 8 the columns use,
+        | a memoryview reads the int32 columns in place, even when they're memory-mapped
         """
-        
-        stack = deque()
-        stack.append(self.root)
+        return memoryview(self.left), memoryview(self.right)
+
+    def inorder(self):
+        left, right = self._links()
+        stack, idx = [], self.root
+        while stack or idx != -1:
+            while idx != -1:
+                stack.append(idx)
+                idx = left[idx]
+            idx = stack.pop()
+            yield idx
+            idx = right[idx]
 
+    def preorder(self):
+        if self.root == -1:
+            return None
+        left, right = self._links()
+        stack = [self.root]
         while stack:
-            node = stack.popleft()
-            yield node
+            idx = stack.pop()
+            yield idx
+            if right[idx] != -1:
+                stack.append(right[idx])
+            if left[idx] != -1:
+                stack.append(left[idx])
 
-            if node.left is not None:
-                stack.append(node.left)
+    def postorder(self):
+        """One stack of ancestors, a node is yielded once its right subtree was the last thing yielded"""
+        left, right = self._links()
+        stack, idx, last = [], self.root, -1
+        while stack or idx != -1:
+            if idx != -1:
+                stack.append(idx)
+                idx = left[idx]
+                continue
+            top = stack[-1]
+            if right[top] != -1 and right[top] != last:
+                idx = right[top]
+            else:
+                yield top
+                last = stack.pop()
+
+    def levelorder(self):
+        if self.root == -1:
+            return None
+        left, right = self._links()
+        queue = deque([self.root])
+        while queue:
+            idx = queue.popleft()
+            yield idx
+            if left[idx] != -1:
+                queue.append(left[idx])
+            if right[idx] != -1:
+                queue.append(right[idx])
+
+    @classmethod
+    def from_sorted(cls, array, dtype=None):
+        """
+        | Bulk-loads a balanced tree from sorted data in O(n), node i holds array[i]
+        | Builds one level at a time, every range on a level is split in a single vectorized step
+
+        .. code-block:: python
 
+            >>> tree = CompactTree.from_sorted(np.arange(10**7))
+        """
+        keys = np.asarray(array, dtype=dtype)
+        size = len(keys)
+
+        tree = cls(dtype=keys.dtype, capacity=0)
+        tree.keys, tree.size = keys.copy(), size
+        tree.left = np.full(size, -1, dtype=np.int32)
+        tree.right = np.full(size, -1, dtype=np.int32)
+        if size == 0:
+            return tree
+
+        tree.root = size // 2
+        lo, hi = np.array([0]), np.array([size])
+        while lo.size:
+            mid = (lo + hi) // 2
+
+            has_left = lo < mid
+            left_lo, left_hi = lo[has_left], mid[has_left]
+            tree.left[mid[has_left]] = (left_lo + left_hi) // 2
+
+            has_right = mid + 1 < hi
+            right_lo, right_hi = mid[has_right] + 1, hi[has_right]
+            tree.right[mid[has_right]] = (right_lo + right_hi) // 2
+
+            lo = np.concatenate([left_lo, right_lo])
+            hi = np.concatenate([left_hi, right_hi])
+
+        return tree
+
+    @classmethod
+    def from_unsorted(cls, iterable, dtype=None):
+        """Sorts with np.unique, dropping duplicates like insert does, then bulk-loads"""
+        if not isinstance(iterable, np.ndarray):
+            iterable = list(iterable)
+        return cls.from_sorted(np.unique(np.asarray(iterable, dtype=dtype)))
+
+    @classmethod
+    def from_tree(cls, tree, dtype=np.float64):
+        """Copies a BinaryTree of Nodes, nodes are numbered in level order"""
+        compact = cls(dtype=dtype, capacity=16)
+        if tree.root is None:
+            return compact
+
+        compact.root = compact.add_node(tree.root.data)
+        queue = deque([(tree.root, compact.root)])
+        while queue:
+            node, idx = queue.popleft()
+            if node.left is not None:
+                compact.left[idx] = compact.add_node(node.left.data)
+                queue.append((node.left, compact.left[idx]))
             if node.right is not None:
-                stack.append(node.right)
-                
-    def iterative_inorder(self, node='default'):
+                compact.right[idx] = compact.add_node(node.right.data)
+                queue.append((node.right, compact.right[idx]))
+
+        return compact
+
+    def to_tree(self, tree_class=None):
+        """Builds a BinaryTree of Nodes with the same shape, or a BinaryHeap with tree_class=BinaryHeap"""
+        tree_class = tree_class or BinaryTree
+        if self.root == -1:
+            return tree_class()
+
+        left, right = self._links()
+        nodes = []
+        for start in range(0, self.size, 2**16):  # convert the keys a chunk at a time
+            nodes.extend(Node(data) for data in self.keys[start:min(start + 2**16, self.size)].tolist())
+        for idx, node in enumerate(nodes):
+            if left[idx] != -1:
+                node.left = nodes[left[idx]]
+            if right[idx] != -1:
+                node.right = nodes[right[idx]]
+
+        return tree_class(nodes[self.root])
+
+    def level_order_columns(self):
         """
-        | See: https://www.geeksforgeeks.org/inorder-tree-traversal-without-recursion/
-        
-        #. Create an empty stack.
-        #. Initialize current node as root
-        #. Push the current node to S and set current = current->left until current is NULL
-        #. If current is NULL and stack is not empty then
+        | Returns keys, left and right renumbered in level order, so the root is node 0
+        | Each level is found in one vectorized step from the one above
+        """
+        size = self.size
+        keys, left, right = self.keys[:size], self.left[:size], self.right[:size]
+        if size == 0:
+            return keys.copy(), left.copy(), right.copy()
 
-             a) Pop the top item from stack.
-             b) Print the popped item, set current = popped_item->right 
-             c) Go to step 3.
-        #. If current is NULL and stack is empty then we are done.
-        
-        | Example
-        
-            #. add 27, add 14, add 10, pop 10, return 10, node.right=None
-            #. pop 14, return 14, node.right=19
-            #. add 19, pop 19, return 19, node.right=None
-            #. pop 27, return 27, node.right=35
-            #. add 35, add 31, pop 31, return 31, node.right=None
-            #. pop 35, return 35, node.right=42
-            #. add 42, pop 42, return 42, node.right=None
+        levels, level = [], np.array([self.root])
+        while level.size:
+            levels.append(level)
+            children = np.column_stack([left[level], right[level]]).ravel()
+            level = children[children != -1]
+        order = np.concatenate(levels)
+
+        new_idx = np.empty(size + 1, dtype=np.int32)
+        new_idx[order] = np.arange(size, dtype=np.int32)
+        new_idx[-1] = -1  # child -1 maps to -1
+
+        return keys[order], new_idx[left[order]], new_idx[right[order]]
+
+    def save(self, path):
         """
-        
-        if node=='default':
-            node = self.root
-            
-        stack = deque()
-        
-        while True:
-            # during first loop, adds all left nodes to stack
-            # during subsequent loops, may add if node.right exists
-            while node is not None:
-                stack.append(node)
-                node = node.left
-            
-            if stack:
-                node = stack.pop()
-                yield node
-                node = node.right  # adds node.right to stack if it exists
-                
-            else:
-                break
+        | Saves the tree as one flat .npy file of (key, left, right) records in level order
+        | Use load to read it back, keys must be a numeric or fixed-width dtype
+        """
+        keys, left, right = self.level_order_columns()
 
-    def print_tree(self, order='inorder'):
-        i = 0
-        if order == 'inorder':
-            
-            for node in self.recursive_inorder():
-                print(node.data)
-                i += 1
-                if i == 100:
-                    break
-                
-        if order == 'levelorder':
-            for node in self.iterative_levelorder():
-                print(node.data)
-                i += 1
-                if i == 100:
-                    break
-                
\ No newline at end of file
+        records = np.empty(self.size, dtype=[('key', keys.dtype), ('left', np.int32), ('right', np.int32)])
+        records['key'], records['left'], records['right'] = keys, left, right
+        np.save(path, records, allow_pickle=False)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        | Loads a tree written by save
+        | With mmap=True the file is memory-mapped read-only, loading is O(1),
+        | pages are read on first access and shared between processes mapping the same file
+        | Inserting into a memory-mapped tree first copies its columns into memory
+
+        .. code-block:: python
+
+            >>> CompactTree.from_sorted(np.arange(10**7)).save('lookup.npy')
+            >>> tree = CompactTree.load('lookup.npy')  # in each worker
+            >>> tree.binary_search(1234567)
+        """
+        records = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+        tree = cls(dtype=records.dtype['key'], capacity=0)
+        tree.keys, tree.left, tree.right = records['key'], records['left'], records['right']
+        tree.size = len(records)
+        tree.root = 0 if tree.size else -1
+
+        return tree
+
+
+class IntervalIndex:
+    """
+    | Index over [start, stop) intervals, built once and reused for many lookups
+    | Intervals can overlap, have gaps and non-uniform widths
+    | Stores the starts in sorted order and the running maximum of the stops,
+    | so the intervals that can contain x all sit between two binary searches
+
+    #. locate, vectorized, returns one interval id per value, -1 for misses
+    #. stab, returns the ids of every interval containing a point
+
+    | Ids are positions in the intervals passed in
+    | When intervals overlap, locate returns the one reaching furthest right
+
+    | Runtimes:
+
+    #. build: O(n log n)
+    #. locate: O(log n) per value
+    #. stab: O(log n + k), k is the number of intervals starting before the point that reach past it
+
+    .. code-block:: python
+
+        >>> index = IntervalIndex([(0, 10), (5, 15), (20, 30)])
+        >>> index.locate([3, 12, 17, 25])
+        array([ 0,  1, -1,  2])
+        >>> index.stab(7)
+        array([0, 1])
+    """
+
+    def __init__(self, intervals):
+        intervals = np.asarray(intervals).reshape(-1, 2)
+
+        self.order = np.argsort(intervals[:, 0], kind='stable')
+        self.starts = intervals[self.order, 0]
+        self.stops = intervals[self.order, 1]
+
+        # running max of the stops and the position it came from
+        self.max_stops = np.maximum.accumulate(self.stops) if len(self.stops) else self.stops
+        is_new_max = np.ones(len(self.stops), dtype=bool)
+        is_new_max[1:] = self.stops[1:] > self.max_stops[:-1]
+        self.max_positions = np.maximum.accumulate(np.where(is_new_max, np.arange(len(self.stops)), 0))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def locate(self, values):
+        """Returns the id of an interval containing each value, or -1"""
+        values = np.asarray(values)
+        if len(self) == 0:
+            return np.full(values.shape, -1, dtype=np.int64) if values.ndim else -1
+
+        last_start = np.searchsorted(self.starts, values, side='right') - 1
+        clipped = np.maximum(last_start, 0)
+        missing = (last_start < 0) | (values >= self.max_stops[clipped])
+
+        ids = self.order[self.max_positions[clipped]]
+        if values.ndim == 0:
+            return -1 if missing else int(ids)
+
+        ids[missing] = -1
+        return ids
+
+    def stab(self, value):
+        """Returns the ids of every interval containing value, in order of their starts"""
+        first = np.searchsorted(self.max_stops, value, side='right')
+        last = np.searchsorted(self.starts, value, side='right')
+
+        positions = np.arange(first, last)
+        return self.order[positions[self.stops[first:last] > value]]
@@ -32,6 +32,7 @@ from .std.dict import build_nested_dict, merge_dict_with_subdicts
 # # recursive_zip
 # # recursive_unzip
 # # recursive_rm
+# # iter_gzipped_tsv
 # # read_gzipped_tsv
 # # unzip_gzipped_file
 
@@ -303,16 +304,20 @@ def recursive_rm(main_dir, ext):
             recursive_rm(sub_dir, ext)
 
 
-def read_gzipped_tsv(path, strip='!\n', sep='\t'):
-    """Use this to read a single file
+def iter_gzipped_tsv(path, strip='!\n', sep='\t'):
+    """
+    | Yields one row at a time, so memory doesn't grow with the file
+    | Use with top_k or any other streaming consumer
     """
-    
-    array = []
     with gzip.open(path, 'rb') as f:
         for row in f:
-            array.append(list(map(lambda x: x.strip("\""), row.decode().strip("!\n").split(sep))))
-    
-    return array
+            yield list(map(lambda x: x.strip("\""), row.decode().strip(strip).split(sep)))
+
+
+def read_gzipped_tsv(path, strip='!\n', sep='\t'):
+    """Use this to read a single file
+    """
+    return list(iter_gzipped_tsv(path, strip, sep))
 
 
 def unzip_gzipped_file(path):
@@ -0,0 +1,83 @@
+"""Tests for harrison_functions.collections.attr_dict
+"""
+
+import copy
+import json
+import pickle
+from collections.abc import Sequence
+import pytest
+from harrison_functions.collections.attr_dict import AttrDict, LazySequence
+
+
+@pytest.fixture
+def data():
+    return {'a': {'b': {'c': [{'port': 1}, {'port': 2}, 3]}},
+            'items': {'x': 1},
+            'key with spaces': 5}
+
+
+def test_navigation(data):
+    cfg = AttrDict(data)
+    assert cfg.a.b.c[0].port == 1
+    assert cfg.a.b.c[-2].port == 2
+    assert cfg.a.b.c[2] == 3
+    assert cfg['key with spaces'] == 5
+    with pytest.raises(KeyError):
+        cfg.missing
+
+
+def test_wraps_without_copying(data):
+    cfg = AttrDict(data)
+    assert cfg._data is data
+    assert cfg.a._data is data['a']
+
+
+def test_children_are_memoized(data):
+    cfg = AttrDict(data)
+    assert cfg.a is cfg.a
+    assert cfg.a.b.c is cfg.a.b.c
+    assert cfg.a.b.c[0] is cfg.a.b.c[0]
+
+
+def test_replaced_value_is_rebuilt(data):
+    cfg = AttrDict(data)
+    assert cfg.a.b.c[1].port == 2
+    data['a'] = {'b': {'c': []}}
+    assert len(cfg.a.b.c) == 0
+
+
+def test_mapping_attributes_win_regardless_of_access_order(data):
+    cfg = AttrDict(data)
+    assert cfg.items == data.items
+    assert cfg['items'].x == 1
+    assert cfg.items == data.items
+
+
+def test_lazy_sequence(data):
+    rows = AttrDict(data).a.b.c
+    assert isinstance(rows, LazySequence)
+    assert rows == data['a']['b']['c']
+    assert len(rows) == 3
+    assert rows[:1][0].port == 1
+    assert [row for row in rows][2] == 3
+
+
+def test_lazy_sequence_is_a_sequence_and_converts_back(data):
+    rows = AttrDict(data).a.b.c
+    assert isinstance(rows, Sequence)
+    assert not isinstance(rows, list)
+    assert rows.to_list() is data['a']['b']['c']
+    assert json.loads(json.dumps(rows.to_list())) == data['a']['b']['c']
+
+    assert rows == [{'port': 1}, {'port': 2}, 3] and rows != [3]
+    assert rows.index(3) == 2 and rows.count({'port': 2}) == 1
+    assert 3 in rows
+    assert list(reversed(rows))[0] == 3
+    assert rows[-2].port == 2
+
+
+def test_copy_and_pickle(data):
+    cfg = AttrDict(data)
+    assert copy.copy(cfg).a.b.c[0].port == 1
+    assert copy.deepcopy(cfg).a.b.c[1].port == 2
+    assert pickle.loads(pickle.dumps(cfg))['key with spaces'] == 5
@@ -0,0 +1,97 @@
+"""Tests for harrison_functions.collections.cache
+"""
+
+import threading
+import pytest
+from harrison_functions.collections.cache import LRUCache, LFUCache, ThreadSafeCache, cached
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.keys() == ['c', 'a']
+    assert cache.stats.evictions == 1
+
+
+def test_lfu_keeps_new_entry_when_every_entry_is_used():
+    cache = LFUCache(max_size=2)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.put('b', 2)
+    cache.get('b')
+    cache.put('c', 3)
+    assert 'c' in cache
+    assert len(cache) == 2
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = LFUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.keys() == ['a', 'c']
+
+
+def test_cached_lfu_recomputes_each_value_once():
+    calls = []
+
+    @cached(max_size=2, policy='lfu')
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert [square(x) for x in [1, 1, 2, 2, 3, 3, 3, 3]] == [1, 1, 4, 4, 9, 9, 9, 9]
+    assert calls == [1, 2, 3]
+    assert square.cache_info().misses == 3
+    assert square.cache_info().evictions == 1
+
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = LRUCache(max_size=None, ttl=10, timer=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2, ttl=100)
+    now[0] = 11
+    assert 'a' not in cache
+    assert cache.get('a') is None
+    assert cache['b'] == 2
+    now[0] = 200
+    assert cache.expire() == 1
+    assert len(cache) == 0
+
+
+def test_max_bytes():
+    cache = LRUCache(max_size=None, max_bytes=1000, sizeof=len)
+    for key in 'xyz':
+        cache.put(key, key * 400)
+    assert cache.keys() == ['z', 'y']
+    assert cache.nbytes == 800
+    cache.put('w', 'w' * 2000)
+    assert 'w' not in cache
+
+
+def test_missing_key_raises():
+    with pytest.raises(KeyError):
+        LRUCache()['missing']
+
+
+def test_thread_safe_cache():
+    cache = ThreadSafeCache(LFUCache(max_size=50))
+
+    def work():
+        for i in range(2000):
+            cache.put(i % 100, i)
+            cache.get((i * 7) % 100)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
@@ -0,0 +1,135 @@
+"""Tests for harrison_functions.collections.heap
+"""
+
+import random
+import pytest
+from harrison_functions.collections.custom_errors import EmptyListError, ItemNotFoundError
+from harrison_functions.collections.heap import MinHeap, MaxHeap, kway_merge
+from harrison_functions.collections.trees import BinaryHeap, binary_heap_from_array
+
+
+def _check_positions(heap):
+    """Asserts the heap property and that every tracked item's position points back at it"""
+    priorities = list(heap.priorities[:heap.size])
+    for idx in range(1, heap.size):
+        assert not heap._less(priorities[idx], priorities[(idx - 1) // 2])
+    assert len(heap.positions) == sum(item is not None for item in heap.items)
+    for item, idx in heap.positions.items():
+        assert heap.items[idx] == item
+
+
+@pytest.mark.parametrize('backend', ['list', 'numpy'])
+@pytest.mark.parametrize('heap_class, reverse', [(MinHeap, False), (MaxHeap, True)])
+def test_push_pop_order(backend, heap_class, reverse):
+    rng = random.Random(0)
+    priorities = [rng.randrange(100) for _ in range(200)]
+    heap = heap_class(backend=backend, capacity=4)
+    for idx, priority in enumerate(priorities):
+        heap.push(priority, idx)
+    _check_positions(heap)
+
+    popped = [heap.pop() for _ in range(len(heap))]
+    assert [priority for priority, _ in popped] == sorted(priorities, reverse=reverse)
+    assert all(priorities[idx] == priority for priority, idx in popped)
+    with pytest.raises(EmptyListError):
+        heap.pop()
+
+
+@pytest.mark.parametrize('backend', ['list', 'numpy'])
+def test_heapify_matches_push(backend):
+    priorities = [5, 3, 8, 1, 9, 2]
+    heap = MinHeap.heapify(priorities, list('abcdef'), backend=backend)
+    _check_positions(heap)
+    assert [heap.pop() for _ in range(6)] == sorted(zip(priorities, 'abcdef'))
+
+
+@pytest.mark.parametrize('backend', ['list', 'numpy'])
+def test_decrease_key_keeps_positions(backend):
+    rng = random.Random(1)
+    heap = MinHeap(backend=backend)
+    priorities = {}
+    for item in range(100):
+        priorities[item] = rng.randrange(1000, 2000)
+        heap.push(priorities[item], item)
+
+    for _ in range(300):
+        item = rng.choice(list(priorities))
+        priorities[item] -= rng.randrange(1, 100)
+        heap.decrease_key(item, priorities[item])
+        _check_positions(heap)
+
+    with pytest.raises(ValueError):
+        heap.decrease_key(0, priorities[0] + 1)
+    with pytest.raises(ItemNotFoundError):
+        heap.decrease_key('missing', 0)
+
+    popped = [heap.pop() for _ in range(len(heap))]
+    assert [priority for priority, _ in popped] == sorted(priorities.values())
+    assert all(priorities[item] == priority for priority, item in popped)
+
+
+def test_update_and_remove():
+    heap = MaxHeap()
+    for item, priority in zip('abcde', [3, 1, 4, 1.5, 5]):
+        heap.push(priority, item)
+    heap.update('e', 0)
+    heap.update('b', 10)
+    assert heap.remove('c') == 4
+    _check_positions(heap)
+    assert 'c' not in heap
+    assert [heap.pop()[1] for _ in range(len(heap))] == ['b', 'a', 'd', 'e']
+
+
+def test_pushpop():
+    heap = MinHeap()
+    for priority in [4, 6, 8]:
+        heap.push(priority, priority)
+    assert heap.pushpop(1, 1) == (1, 1)
+    assert heap.pushpop(5, 5) == (4, 4)
+    _check_positions(heap)
+    assert [heap.pop()[0] for _ in range(3)] == [5, 6, 8]
+
+
+@pytest.mark.parametrize('backend', ['list', 'numpy'])
+def test_merge(backend):
+    left = MinHeap.heapify([5, 1, 3], ['a', 'b', 'c'], backend=backend)
+    right = MinHeap.heapify([4, 2], ['d', 'e'], backend=backend)
+    merged = left.merge(right)
+    _check_positions(merged)
+    assert len(left) == 3 and len(right) == 2
+    assert [merged.pop() for _ in range(5)] == [(1, 'b'), (2, 'e'), (3, 'c'), (4, 'd'), (5, 'a')]
+
+    with pytest.raises(TypeError):
+        left.merge(MaxHeap())
+
+
+def test_kway_merge():
+    assert list(kway_merge()) == []
+    assert list(kway_merge([], [], [])) == []
+    assert list(kway_merge([1, 4, 7], [], [2, 5], [3, 6, 8, 9, 10])) == list(range(1, 11))
+    assert list(kway_merge(iter([0.5]), (x for x in [0.25, 1.0]))) == [0.25, 0.5, 1.0]
+
+
+def test_kway_merge_is_stable_on_duplicate_keys():
+    left = [(1, 'left'), (2, 'left')]
+    right = [(1, 'right'), (2, 'right')]
+    merged = list(kway_merge(left, right, key=lambda row: row[0]))
+    assert merged == [(1, 'left'), (1, 'right'), (2, 'left'), (2, 'right')]
+
+    rng = random.Random(2)
+    iterables = [sorted(rng.randrange(5) for _ in range(rng.randrange(20))) for _ in range(6)]
+    assert list(kway_merge(*iterables)) == sorted(value for iterable in iterables for value in iterable)
+
+
+def test_binary_heap_heapsort_uses_max_heap_order():
+    values = [2, 10, 9, 5, 6, 1, 10]
+    heap = binary_heap_from_array(values)
+    assert heap.heapsort() == sorted(values)
+
+    nodes = list(heap.iterative_levelorder())
+    for node in nodes:
+        for child in (node.left, node.right):
+            assert child is None or child.data <= node.data
+    assert sorted(node.data for node in nodes) == sorted(values)
+    assert binary_heap_from_array([0.5]).heapsort() == [0.5]
+    assert BinaryHeap().heapsort() == []
@@ -0,0 +1,73 @@
+"""Tests for harrison_functions.algos.instrumentation
+"""
+
+import numpy as np
+from harrison_functions.algos import sorting
+from harrison_functions.algos.instrumentation import (
+    SortStats, CountedItem, CountingList, ProfileHook, instrument, trace,
+)
+
+
+def test_counting_list_counts_item_and_slice_writes():
+    stats = SortStats()
+    array = CountingList([0] * 10, stats)
+    array[0] = 1
+    array[2:5] = [7, 8, 9]
+    array[::2] = [1] * 5
+    assert stats.writes == 9
+
+    view = array[1:4]
+    assert isinstance(view, CountingList)
+    view[0] = 3
+    assert stats.writes == 10
+
+
+def test_counted_item_counts_comparisons():
+    stats = SortStats()
+    a, b = CountedItem(1, stats), CountedItem(2, stats)
+    assert a < b and a <= b and b > a and b >= a and not a == b
+    assert stats.comparisons == 5
+
+
+def test_bubble_sort_known_counts():
+    # 4 + 3 + 2 + 1 comparisons, 6 inversions swapped at 2 writes each
+    data = [5, 1, 4, 2, 3]
+    result, stats = instrument(sorting.bubble_sort, data)
+    assert result == [1, 2, 3, 4, 5]
+    assert result is data
+    assert (stats.comparisons, stats.writes) == (10, 12)
+
+
+def test_bottom_up_merge_sort_counts_buffer_writes():
+    # 5 comparisons find the runs [3, 4] and [1, 2], 1 checks their order, 2 merge them
+    # 4 writes merge into the buffer, 4 copy the buffer back into the array
+    result, stats = instrument(sorting.bottom_up_merge_sort, [3, 4, 1, 2], min_run=1)
+    assert result == [1, 2, 3, 4]
+    assert (stats.comparisons, stats.writes) == (8, 8)
+
+
+def test_profile_hook_records_depth_and_calls():
+    stats = SortStats()
+    with ProfileHook(stats):
+        sorting.merge_sort([4, 3, 2, 1])
+    assert stats.calls['merge_sort'] == 7
+    assert stats.max_depth >= 3
+    assert stats.phase_times['merge_sort'] > 0
+
+
+def test_instrument_without_comparisons_and_on_ndarrays():
+    result, stats = instrument(sorting.radix_sort, [3, 1, 2], count_comparisons=False)
+    assert result == [1, 2, 3]
+    assert stats.comparisons == 0 and stats.writes == 3
+
+    result, stats = instrument(np.sort, np.array([3, 1, 2]))
+    assert result.tolist() == [1, 2, 3]
+    assert stats.writes == 0 and stats.total_time > 0
+
+
+def test_trace_prints_stats(capsys):
+    assert sorting.insertion_sort([2, 1], to_print=True) == [1, 2]
+    output = capsys.readouterr().out
+    assert output.startswith('insertion_sort: SortStats(comparisons=')
+    assert set(SortStats().to_dict()) == {'comparisons', 'writes', 'max_depth', 'calls', 'phase_times', 'total_time'}
+    assert trace(sorted, [2, 1]) == [1, 2]
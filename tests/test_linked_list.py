@@ -0,0 +1,235 @@
+"""Tests for the linked lists and queues in harrison_functions.collections.linked_list
+"""
+
+import asyncio
+import queue
+import threading
+import pytest
+from harrison_functions.collections.custom_errors import EmptyListError, ItemNotFoundError
+from harrison_functions.collections.linked_list import (
+    LinkedList, DoublyNode, DoublyLinkedList, PooledLinkedList, BlockingQueue, BlockingDeque, AsyncQueue,
+)
+
+
+def _check_links(dll):
+    """Walks both ways and checks the links, head, tail and size agree"""
+    forward, node, prev = [], dll.head, None
+    while node is not None:
+        assert node.prev is prev
+        forward.append(node.data)
+        prev, node = node, node.next
+    assert dll.tail is prev
+    assert len(dll) == len(forward)
+    assert list(dll.return_all_reversed(lim=None)) == forward[::-1]
+    return forward
+
+
+def test_doubly_linked_list_push_append_and_ends():
+    dll = DoublyLinkedList()
+    assert not dll and _check_links(dll) == []
+    with pytest.raises(EmptyListError):
+        dll.pop()
+    with pytest.raises(EmptyListError):
+        dll.popleft()
+
+    dll.push(DoublyNode('b'))  # first node is both head and tail
+    assert dll.head is dll.tail
+    dll.append(DoublyNode('c'))
+    dll.appendleft(DoublyNode('a'))
+    assert _check_links(dll) == ['a', 'b', 'c']
+    assert list(dll.return_all(lim=2)) == ['a', 'b']
+    with pytest.raises(IndexError):
+        DoublyLinkedList().get_third_to_last_item()
+    assert dll.get_third_to_last_item() == 'a'
+
+    assert dll.pop().data == 'c' and dll.popleft().data == 'a'
+    last = dll.pop()
+    assert last.data == 'b' and last.prev is None and last.next is None
+    assert dll.head is None and dll.tail is None and _check_links(dll) == []
+
+
+def test_doubly_linked_list_remove_and_move():
+    dll = DoublyLinkedList()
+    nodes = [DoublyNode(item) for item in 'ABCDE']
+    for node in nodes:
+        dll.append(node)
+
+    dll.remove(nodes[0])  # head
+    dll.remove(nodes[4])  # tail
+    dll.remove(nodes[2])  # middle
+    assert _check_links(dll) == ['B', 'D']
+
+    dll.move_to_front(nodes[3])
+    assert _check_links(dll) == ['D', 'B']
+    dll.move_to_front(nodes[3])  # already at the front
+    dll.move_to_back(nodes[3])
+    assert _check_links(dll) == ['B', 'D']
+    dll.move_to_back(nodes[3])  # already at the back
+    assert _check_links(dll) == ['B', 'D']
+
+    assert dll.remove_item('B') is nodes[1]
+    with pytest.raises(ItemNotFoundError):
+        dll.remove_item('B')
+    assert _check_links(dll) == ['D']
+    dll.move_to_front(nodes[3])  # the only node is head and tail
+    assert _check_links(dll) == ['D']
+
+    dll.remove_all()
+    assert _check_links(dll) == []
+
+
+def test_linked_list_from_iterable_and_return_all_limits(capsys):
+    linked = LinkedList.from_iterable(range(250))
+    assert linked.to_list() == list(range(250))
+    assert list(linked.return_all()) == list(range(100))
+    assert list(linked.return_all(lim=3)) == [0, 1, 2]
+    assert list(linked.return_all(lim=0)) == []
+    assert list(linked.return_all(lim=None)) == list(range(250))
+
+    linked.print_all(lim=2)
+    assert capsys.readouterr().out == '0\n1\n'
+    assert LinkedList.from_iterable([]).to_list() == []
+    assert LinkedList.from_iterable(iter('ab')).to_list() == ['a', 'b']
+
+
+def test_pooled_linked_list_reuses_free_slots():
+    pooled = PooledLinkedList(capacity=4)
+    for item in 'abcd':
+        pooled.append(item)
+    assert len(pooled.items) == 4 and pooled.free == -1
+
+    assert pooled.popleft() == 'a'
+    pooled.remove('c')
+    pooled.append('e')  # reuses the slot 'c' was in, the most recently freed
+    pooled.push('f')  # then the slot 'a' was in
+    assert len(pooled.items) == 4
+    assert pooled.to_list() == ['f', 'b', 'd', 'e']
+    assert sorted(pooled.items) == ['b', 'd', 'e', 'f']
+
+    pooled.append('g')  # full, the arrays double
+    assert len(pooled.items) == len(pooled.next) == 20
+    assert pooled.to_list() == ['f', 'b', 'd', 'e', 'g']
+
+
+def test_pooled_linked_list_order_after_removes():
+    pooled = PooledLinkedList.from_iterable(range(10))
+    pooled.remove(0)  # head
+    pooled.remove(9)  # tail
+    pooled.remove(5)
+    assert pooled.to_list() == [1, 2, 3, 4, 6, 7, 8]
+    pooled.append(10)  # the tail pointer moved back to 8
+    assert pooled.to_list() == [1, 2, 3, 4, 6, 7, 8, 10]
+    assert list(pooled.return_all(lim=2)) == [1, 2] and pooled.peek() == 1
+    with pytest.raises(ItemNotFoundError):
+        pooled.remove(5)
+
+    while pooled:
+        pooled.popleft()
+    assert pooled.head == pooled.tail == -1
+    with pytest.raises(EmptyListError):
+        pooled.popleft()
+    pooled.append('x')
+    assert pooled.to_list() == ['x'] and pooled.peek() == 'x'
+
+    pooled.remove_all()
+    assert pooled.to_list() == [] and len(pooled) == 0
+    pooled.push('y')
+    assert pooled.to_list() == ['y']
+
+
+def test_blocking_queue_put_get_many():
+    q = BlockingQueue(maxsize=10)
+    q.put_many(range(5))
+    assert q.get() == 0
+    assert q.get_many(10, timeout=1) == [1, 2, 3, 4]
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+
+
+def test_blocking_queue_full():
+    q = BlockingQueue(maxsize=2)
+    q.put(1)
+    q.put(2)
+    assert q.full()
+    with pytest.raises(queue.Full):
+        q.put(3, block=False)
+
+
+def test_blocking_deque_both_ends():
+    d = BlockingDeque(maxsize=10)
+    d.put('a')
+    d.put('b')
+    d.put_left('urgent')
+    assert d.get() == 'urgent'
+    assert d.get_right() == 'b'
+    assert len(d) == 1
+
+
+def test_blocking_queue_threads_deliver_everything():
+    q = BlockingQueue(maxsize=50)
+    num_items, received = 20000, []
+
+    def consume():
+        while True:
+            batch = q.get_many(64)
+            received.extend(item for item in batch if item is not None)
+            if None in batch:
+                return
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    producers = [threading.Thread(target=q.put_many, args=(range(i, num_items, 2),)) for i in range(2)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    q.put(None)
+    consumer.join(timeout=10)
+
+    assert sorted(received) == list(range(num_items))
+
+
+def test_async_queue_gets_items_from_threads():
+    async def main():
+        q = AsyncQueue(BlockingQueue(maxsize=3))
+        producer = threading.Thread(target=q.queue.put_many, args=(range(10),))
+        producer.start()
+        items = []
+        while len(items) < 10:
+            items += await q.get_many(100, timeout=5)
+        producer.join()
+        await q.put_many(['x', 'y'])
+        return items, await q.get_many(5)
+
+    items, rest = asyncio.run(main())
+    assert items == list(range(10))
+    assert rest == ['x', 'y']
+
+
+def test_async_queue_cancelled_get_never_takes_an_item():
+    async def main():
+        q = AsyncQueue(BlockingQueue())
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(q.get(), 0.05)
+
+        producer = threading.Thread(target=q.queue.put, args=('important',))
+        producer.start()
+        producer.join()
+        await asyncio.sleep(0.05)
+        assert q.qsize() == 1
+        return await q.get(timeout=1)
+
+    assert asyncio.run(asyncio.wait_for(main(), 5)) == 'important'
+
+
+def test_async_queue_timeouts():
+    async def main():
+        q = AsyncQueue(BlockingQueue(maxsize=1))
+        with pytest.raises(queue.Empty):
+            await q.get(timeout=0.01)
+        await q.put(1)
+        with pytest.raises(queue.Full):
+            await q.put(2, timeout=0.01)
+        return await q.get()
+
+    assert asyncio.run(main()) == 1
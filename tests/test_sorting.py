@@ -0,0 +1,329 @@
+"""Tests for harrison_functions.algos.sorting
+"""
+
+import gzip
+import math
+import random
+import numpy as np
+import pytest
+from array import array
+from harrison_functions.algos import sorting
+from harrison_functions.algos.sorting import (
+    sort, sort_path, argsort, take, idx_hash_table_for_array, map_hash, counting_sort, bucket_sort, external_sort, parallel_sort, radix_sort, np_radix_sort, select_kth, partial_sort, top_k,
+)
+from harrison_functions.collections.trees import IntervalIndex
+
+
+@pytest.mark.parametrize('num_values', [1, 2, 4, 1000])
+def test_select_kth_matches_sorted(num_values):
+    rng = random.Random(num_values)
+    for _ in range(50):
+        array = [rng.randrange(num_values) for _ in range(rng.randint(1, 200))]
+        k = rng.randrange(len(array))
+        assert select_kth(array, k) == sorted(array)[k]
+
+
+def test_select_kth_accepts_iterators_and_leaves_input_alone():
+    assert select_kth(iter([5, 3, 9]), 1) == 5
+    assert select_kth((num % 7 for num in range(100)), 99) == 6
+    data = [3, 1, 2]
+    assert select_kth(data, 0) == 1
+    assert data == [3, 1, 2]
+    with pytest.raises(IndexError):
+        select_kth(iter([]), 0)
+
+
+def test_select_kth_all_equal_is_linear():
+    assert select_kth([7] * 200000, 100000) == 7
+
+
+def test_select_kth_out_of_range():
+    with pytest.raises(IndexError):
+        select_kth([1, 2], 2)
+
+
+def test_select_kth_ndarray():
+    array = np.array([6, 2, 4, 5, 1, 3])
+    assert select_kth(array, 2) == 3
+
+
+@pytest.mark.parametrize('num_values', [4, 1000])
+def test_partial_sort_duplicates(num_values):
+    rng = random.Random(num_values)
+    array = [rng.randrange(num_values) for _ in range(20000)]
+    expected = sorted(array)
+    result = partial_sort(array, 500)
+    assert result[:500] == expected[:500]
+    assert sorted(result) == expected
+
+
+def test_top_k():
+    assert top_k([6, 2, 4, 5, 1, 3], 3) == [6, 5, 4]
+    assert top_k([6, 2, 4, 5, 1, 3], 2, largest=False) == [1, 2]
+    assert top_k(iter(['bb', 'a', 'ccc']), 1, key=len) == ['ccc']
+    assert top_k(np.array([6, 2, 4]), 2).tolist() == [6, 4]
+
+
+def test_top_k_zero_keeps_type():
+    empty = top_k(np.array([3, 1, 2]), 0)
+    assert isinstance(empty, np.ndarray) and empty.size == 0
+    assert top_k([3, 1, 2], 0) == []
+
+
+@pytest.mark.parametrize('data', [
+    [5, 3, 8, 3, 1, 9, 0, 3],
+    [10**12, -5, 3, 10**12, 0],
+    [0.5, -1.25, 3.0, 0.5, 2.0],
+])
+def test_sort_auto_uses_np_sort(data):
+    result, path = sort(data, return_path=True)
+    assert path == 'numpy'
+    assert result == sorted(data)
+    assert isinstance(result, list)
+
+    result = sort(np.array(data))
+    assert isinstance(result, np.ndarray)
+    np.testing.assert_array_equal(result, np.sort(data))
+
+
+@pytest.mark.parametrize('algorithm', ['counting', 'radix', 'merge', 'bottom_up_merge', 'quick', 'heap', 'intro'])
+def test_sort_explicit_algorithm(algorithm):
+    rng = random.Random(0)
+    data = [rng.randrange(-50, 50) for _ in range(500)]
+    assert list(sort(data, algorithm)) == sorted(data)
+    assert list(sort(np.array(data), algorithm)) == sorted(data)
+
+
+def test_sort_path():
+    assert sort_path([3, 1, 2], 'radix') == 'numpy_radix'
+    assert sort_path([0.5, 0.25], 'counting') == 'numpy_merge'
+    assert sort_path(['b', 'a']) == 'bottom_up_merge'
+    assert sort(['b', 'c', 'a']) == ['a', 'b', 'c']
+
+
+@pytest.mark.parametrize('algorithm', ['auto', 'counting', 'radix', 'merge', 'bottom_up_merge', 'insertion'])
+def test_argsort_is_stable(algorithm):
+    rng = random.Random(1)
+    data = [rng.randrange(5) for _ in range(300)]
+    expected = sorted(range(len(data)), key=data.__getitem__)
+
+    order = argsort(data, algorithm)
+    assert isinstance(order, array)
+    assert list(order) == expected
+
+    order = argsort(np.array(data), algorithm)
+    assert list(order) == expected
+
+
+def test_argsort_auto_on_ndarray_matches_numpy():
+    data = np.random.default_rng(2).integers(0, 10, 1000)
+    np.testing.assert_array_equal(argsort(data), np.argsort(data, kind='stable'))
+
+
+def test_argsort_strings():
+    data = ['pear', 'apple', 'fig', 'apple']
+    assert list(argsort(data)) == [1, 3, 2, 0]
+
+
+@pytest.mark.parametrize('algorithm', ['auto', 'radix', 'bubble', 'quick', 'heap', 'bottom_up_merge'])
+@pytest.mark.parametrize('data', [[3, 1, 2], ['b', 'a', 'c'], [2.5, 1]])
+def test_sort_never_mutates_its_input(algorithm, data):
+    original = data[:]
+    result = sort(data, algorithm)
+    assert result is not data
+    assert list(result) == sorted(original)
+    assert data == original
+
+
+def test_sort_accepts_any_iterable():
+    assert sort((3, 1, 2)) == [1, 2, 3]
+    assert sort(('b', 'a')) == ['a', 'b']
+    assert sort(iter([0.5, 0.25])) == [0.25, 0.5]
+    assert sort(range(3, 0, -1), 'insertion') == [1, 2, 3]
+
+    array = np.array([3, 1, 2])
+    result = sort(array, 'quick')
+    assert result.tolist() == [1, 2, 3]
+    assert array.tolist() == [3, 1, 2]
+
+
+def test_np_radix_sort_keeps_original_values():
+    result = np_radix_sort(np.array([-0.0, 1.0, -1.0, 0.0]))
+    assert result.tolist() == [-1.0, 0.0, 0.0, 1.0]
+    assert np.signbit(result).tolist() == [True, True, False, False]  # stable, -0.0 stays first
+
+    array = np.array([3.0, -np.nan, -np.inf, 1.0, np.nan, np.inf], dtype=np.float32)
+    result = np_radix_sort(array)
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, np.sort(array))
+
+
+@pytest.mark.parametrize('dtype', [np.int8, np.int64, np.uint16, np.uint64, np.float64])
+def test_np_radix_sort_matches_np_sort(dtype):
+    rng = np.random.default_rng(4)
+    if np.dtype(dtype).kind == 'f':
+        array = rng.standard_normal(1000) * 10.0 ** rng.integers(-300, 300, 1000)
+    else:
+        info = np.iinfo(dtype)
+        array = rng.integers(info.min, info.max, 1000, dtype=dtype, endpoint=True)
+    np.testing.assert_array_equal(np_radix_sort(array), np.sort(array))
+
+
+@pytest.mark.parametrize('data', [
+    [1, 203, -10, 14, -10, 0],
+    [2**70, -2**70, 3, True, False],
+    [2.5, -0.5, 1e-3, -1e300, 0, 7],
+    ['banana', 'apple', 'app', '', 'éclair', 'Zebra', 'apple'],
+    [b'b', b'a\x00', b'a', b''],
+])
+def test_radix_sort_pure_python(data):
+    assert radix_sort(data[:]) == sorted(data)
+
+
+def test_radix_sort_floats_keep_sign_of_zero_and_put_nan_last():
+    result = radix_sort([0.0, -0.0, -1.0, float('nan'), -float('nan'), 1.0])
+    assert result[:4] == [-1.0, 0.0, -0.0, 1.0]
+    assert [math.copysign(1, num) for num in result[1:3]] == [1, -1]
+    assert all(math.isnan(num) for num in result[4:])
+
+
+def test_radix_sort_rejects_mixed_types():
+    with pytest.raises(TypeError):
+        radix_sort([1, 'a'])
+
+
+@pytest.mark.parametrize('data', [
+    [3, 1, 2, 1, 0],
+    [-5, 3, -5, 0],
+    [0, 10**9, 5, 5, -10**9],
+    [2**70, 1, -2**70, 1],
+    [0.5, -1.5, 0.5],
+])
+def test_counting_sort_dense_and_sparse(data):
+    assert counting_sort(data) == sorted(data)
+
+
+def test_counting_sort_keeps_bools():
+    result = counting_sort([True, False, True])
+    assert result == [False, True, True]
+    assert all(type(item) is bool for item in result)
+
+
+def test_counting_sort_key_mode_is_stable():
+    rows = [('b', 2), ('a', 1), ('c', 2), ('d', -3), ('e', 1)]
+    assert counting_sort(rows, key=lambda row: row[1]) == [('d', -3), ('a', 1), ('e', 1), ('b', 2), ('c', 2)]
+
+    sparse = [('x', 10**9), ('y', 0), ('z', 10**9), ('w', 0)]
+    assert counting_sort(sparse, key=lambda row: row[1]) == [('y', 0), ('w', 0), ('x', 10**9), ('z', 10**9)]
+    assert counting_sort([], key=len) == []
+
+
+def test_idx_hash_table_and_map_hash_are_deprecated():
+    data = ['b', 'a', 'c']
+    with pytest.warns(DeprecationWarning, match='argsort'):
+        table = idx_hash_table_for_array(data)
+    with pytest.warns(DeprecationWarning, match='argsort and take'):
+        positions = map_hash(sorted(data), table)
+    assert positions == list(argsort(data)) == [1, 0, 2]
+    assert take(data, argsort(data)) == ['a', 'b', 'c']
+
+
+INTERVALS = [(50.0, 75.0), (0, 25.0), (75.0, 100.0), (25.0, 50.0)]
+
+
+def test_bucket_sort_orders_buckets_by_start():
+    data = [64, 34, 25, 12, 22, 11, 90, 75, 0]
+    assert bucket_sort(data, INTERVALS) == sorted(data)
+    np.testing.assert_array_equal(bucket_sort(np.array(data), INTERVALS), sorted(data))
+
+
+def test_bucket_sort_reuses_interval_index():
+    index = IntervalIndex(INTERVALS)
+    rng = random.Random(3)
+    for _ in range(3):
+        data = [rng.uniform(0, 100) for _ in range(100)]
+        assert bucket_sort(data, index) == sorted(data)
+    assert bucket_sort([], index) == []
+
+
+def test_bucket_sort_rejects_values_outside_intervals():
+    with pytest.raises(ValueError):
+        bucket_sort([10, 110], INTERVALS)
+
+
+def _count_merges(monkeypatch):
+    """Wraps _kway_merge_files so a test can see how many runs each merge read"""
+    merges = []
+    merge_files = sorting._kway_merge_files
+
+    def counting_merge(paths, *args, **kwargs):
+        merges.append(len(paths))
+        return merge_files(paths, *args, **kwargs)
+
+    monkeypatch.setattr(sorting, '_kway_merge_files', counting_merge)
+    return merges
+
+
+def test_external_sort_multi_pass(tmp_path, monkeypatch):
+    rng = random.Random(8)
+    lines = [f'{rng.choice("abcdef")}{rng.randrange(50)}' for _ in range(200)]
+    input_path = tmp_path / 'input.txt'
+    input_path.write_text('\n'.join(lines), encoding='utf-8')  # no newline after the last line
+
+    merges = _count_merges(monkeypatch)
+    output_path = external_sort(str(input_path), str(tmp_path / 'output.txt'), memory_limit=400, fan_in=3)
+
+    assert open(output_path, encoding='utf-8').read().splitlines() == sorted(lines)
+    assert len(merges) > 3  # several intermediate passes, then the final merge
+    assert max(merges) <= 3
+
+
+def test_external_sort_gzip_header_and_key(tmp_path, monkeypatch):
+    rows = [(f'id{idx}', str(num)) for idx, num in enumerate([10, 9, 100, 9, -1, 10, 0, 9] * 10)]
+    input_path = str(tmp_path / 'input.tsv.gz')
+    with gzip.open(input_path, 'wt', encoding='utf-8') as f:
+        f.write('name\tvalue\n')
+        f.writelines(f'"{name}"\t{num}\n' for name, num in rows)
+
+    merges = _count_merges(monkeypatch)
+    output_path = external_sort(input_path, str(tmp_path / 'output.tsv.gz'), column=1, key=int,
+                                header=True, memory_limit=1000, fan_in=4)
+
+    with gzip.open(output_path, 'rt', encoding='utf-8') as f:
+        output = f.read().splitlines()
+    assert output[0] == 'name\tvalue'
+    assert [line.split('\t') for line in output[1:]] == \
+        [[f'"{name}"', num] for name, num in sorted(rows, key=lambda row: int(row[1]))]  # stable
+    assert len(merges) > 1
+
+    # by the string in the column, '10' sorts before '9'
+    output_path = external_sort(input_path, str(tmp_path / 'by_str.tsv'), column=1, header=True,
+                                memory_limit=1000, fan_in=4)
+    values = [line.split('\t')[1] for line in open(output_path, encoding='utf-8').read().splitlines()[1:]]
+    assert values == sorted(num for _, num in rows)
+
+    # key on the whole parsed row, descending value then name
+    output_path = external_sort(input_path, str(tmp_path / 'by_row.tsv'), header=True, memory_limit=1000,
+                                key=lambda row: (-int(row[1]), row[0]))
+    names = [line.split('\t')[0].strip('"') for line in open(output_path, encoding='utf-8').read().splitlines()[1:]]
+    assert names == [name for name, _ in sorted(rows, key=lambda row: (-int(row[1]), row[0]))]
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+@pytest.mark.parametrize('dtype', [np.int64, np.float32])
+def test_parallel_sort_shared_memory(workers, dtype):
+    array = (np.random.default_rng(9).standard_normal(5001) * 1000).astype(dtype)
+    result = parallel_sort(array, workers=workers, min_chunk_size=100)
+    assert isinstance(result, np.ndarray) and result.dtype == dtype
+    np.testing.assert_array_equal(result, np.sort(array))
+
+    data = array.tolist()
+    assert parallel_sort(data, workers=workers, algorithm='radix', min_chunk_size=100) == sorted(data)
+
+
+def test_parallel_sort_list_path():
+    rng = random.Random(10)
+    data = [rng.choice(['pear', 'apple', 'fig']) + str(rng.randrange(100)) for _ in range(3000)]
+    assert parallel_sort(data, workers=2, min_chunk_size=100) == sorted(data)
+    assert parallel_sort(data, workers=2, algorithm='heap', min_chunk_size=100) == sorted(data)
+    assert parallel_sort(data[:50], workers=2, min_chunk_size=100) == sorted(data[:50])  # too small to split
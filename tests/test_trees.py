@@ -0,0 +1,382 @@
+"""Tests for harrison_functions.collections.trees
+"""
+
+import random
+import bisect
+import numpy as np
+import pytest
+from harrison_functions.collections.custom_errors import ItemNotFoundError, MethodNotFoundError
+from harrison_functions.collections.trees import (
+    AVLTree, BinaryTree, BinaryHeap, CompactTree, IntervalIndex, Node,
+    balanced_root_from_sorted_array, balanced_tree_from_sorted_array, binary_heap_from_array,
+    bucket_ids, bucketer,
+)
+
+
+def test_save_load_keeps_large_ints(tmp_path):
+    path = tmp_path / 'tree.npy'
+    keys = [1, 2, 2**60 + 1]
+    BinaryTree.from_sorted(keys).save(path)
+    assert BinaryTree.load(path).to_array(dtype=np.int64).tolist() == keys
+    loaded = CompactTree.load(path)
+    assert loaded.keys.dtype == np.int64
+    assert loaded.binary_search(2**60 + 1) != -1
+
+
+def test_save_rejects_lossy_dtype_and_str_keys(tmp_path):
+    with pytest.raises(ValueError):
+        BinaryTree.from_sorted([1, 2, 2**60 + 1]).save(tmp_path / 'lossy.npy', dtype=np.float64)
+    with pytest.raises(TypeError):
+        BinaryTree.from_sorted(['a', 'b']).save(tmp_path / 'str.npy')
+
+
+def test_heap_save_load_keeps_shape(tmp_path):
+    path = tmp_path / 'heap.npy'
+    values = [2.5, 10.0, 9.0, 5.0]
+    binary_heap_from_array(values).save(path)
+    heap = BinaryHeap.load(path, mmap=False)
+    assert [node.data for node in heap.iterative_levelorder()] == values
+
+
+def test_avl_tree_accepts_ndarray():
+    from harrison_functions.algos.sorting import tree_sort
+    assert list(AVLTree(np.array([3, 1, 2]))) == [1, 2, 3]
+    assert tree_sort(np.array([3, 1, 2])).tolist() == [1, 2, 3]
+
+
+def _check_avl(node):
+    """Returns (height, size) of the subtree, asserting the AVL, order and size invariants"""
+    if node is None:
+        return 0, 0
+    left_height, left_size = _check_avl(node.left)
+    right_height, right_size = _check_avl(node.right)
+    assert abs(left_height - right_height) <= 1
+    assert node.height == 1 + max(left_height, right_height)
+    assert node.size == node.count + left_size + right_size
+    assert node.left is None or node.left.data < node.data
+    assert node.right is None or node.data < node.right.data
+    return node.height, node.size
+
+
+def _check_queries(tree, expected):
+    assert list(tree) == expected
+    assert len(tree) == len(expected)
+    for k, item in enumerate(expected):
+        assert tree.select(k) == item
+    for value in range(-2, 62):
+        left, right = bisect.bisect_left(expected, value), bisect.bisect_right(expected, value)
+        assert tree.rank(value) == left
+        assert tree.bisect_right(value) == right
+        assert tree.count(value) == right - left
+        assert tree.floor(value) == (expected[right - 1] if right else None)
+        assert tree.ceiling(value) == (expected[left] if left < len(expected) else None)
+        assert list(tree.range_query(value, value + 7)) == expected[left:bisect.bisect_left(expected, value + 7)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_avl_invariants_through_inserts_and_deletes(seed):
+    rng = random.Random(seed)
+    tree, expected = AVLTree(), []
+    for _ in range(400):
+        item = rng.randrange(60)
+        tree.insert(item)
+        bisect.insort(expected, item)
+        _check_avl(tree.root)
+    _check_queries(tree, expected)
+
+    for _ in range(300):
+        item = rng.choice(expected)
+        tree.delete(item)
+        expected.remove(item)
+        _check_avl(tree.root)
+    _check_queries(tree, expected)
+
+
+def test_avl_sorted_input_and_bulk_load():
+    items = [i // 3 for i in range(3000)]
+    for tree in (AVLTree(items), AVLTree.from_sorted(items), AVLTree.from_unsorted(items[::-1])):
+        height, size = _check_avl(tree.root)
+        assert size == 3000
+        assert height <= 15
+        assert list(tree) == items
+        assert (tree.min(), tree.max()) == (0, 999)
+
+
+def test_avl_errors():
+    tree = AVLTree([1, 2])
+    with pytest.raises(ItemNotFoundError):
+        tree.delete(3)
+    with pytest.raises(IndexError):
+        tree.select(2)
+    assert AVLTree().min() is None
+
+
+def _brute_stab(intervals, value):
+    return [i for i, (start, stop) in enumerate(intervals) if start <= value < stop]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_interval_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    intervals = []
+    for _ in range(60):
+        start = rng.randrange(100)
+        intervals.append((start, start + rng.randint(1, 20)))
+    index = IntervalIndex(intervals)
+
+    values = np.arange(-5, 130)
+    ids = index.locate(values)
+    for value, found in zip(values, ids):
+        containing = _brute_stab(intervals, value)
+        assert sorted(index.stab(value)) == containing
+        if containing:
+            assert found in containing
+            assert intervals[found][1] == max(intervals[i][1] for i in containing)
+        else:
+            assert found == -1
+        assert index.locate(value) == found
+
+
+def test_interval_index_edges():
+    index = IntervalIndex([(0, 10), (5, 15), (20, 30)])
+    np.testing.assert_array_equal(index.locate([0, 10, 15, 19, 20, 30]), [0, 1, -1, -1, 2, -1])
+    assert list(index.stab(9.5)) == [0, 1]
+
+    empty = IntervalIndex([])
+    assert empty.locate(3) == -1
+    np.testing.assert_array_equal(empty.locate([1, 2]), [-1, -1])
+    assert len(empty.stab(3)) == 0
+
+
+def test_bucketer_groups_values_and_drops_remainders():
+    intervals = [(0, 25.0), (25.0, 50.0), (50.0, 75.0), (75.0, 100.0)]
+    data = [64, 34, 25, 12, 22, 11, 90, 110, -1]
+    expected = [[12, 22, 11], [34, 25], [64], [90]]
+    assert bucketer(data, intervals) == expected
+    assert bucketer(data, IntervalIndex(intervals)) == expected
+    assert [bucket.tolist() for bucket in bucketer(np.array(data), intervals)] == expected
+    assert bucket_ids(data, intervals).tolist() == [2, 1, 1, 0, 0, 0, 3, -1, -1]
+
+
+def _compact_orders(tree):
+    """Recursive reference traversals over the index columns"""
+    orders = {'inorder': [], 'preorder': [], 'postorder': []}
+
+    def visit(idx):
+        if idx == -1:
+            return
+        orders['preorder'].append(idx)
+        visit(int(tree.left[idx]))
+        orders['inorder'].append(idx)
+        visit(int(tree.right[idx]))
+        orders['postorder'].append(idx)
+
+    visit(tree.root)
+    return orders
+
+
+def test_compact_tree_insert_and_search():
+    rng = random.Random(6)
+    data = [rng.randrange(500) for _ in range(300)]
+    tree = CompactTree(dtype=np.int64, capacity=2)
+    for item in data:
+        idx = tree.insert(item)
+        assert tree.keys[idx] == item
+    assert len(tree) == len(set(data))
+    assert tree.keys[list(tree.inorder())].tolist() == sorted(set(data))
+    for value in range(-1, 501):
+        idx = tree.binary_search(value)
+        assert (idx != -1) == (value in set(data))
+        assert idx == -1 or tree.keys[idx] == value
+
+
+@pytest.mark.parametrize('build', ['insert', 'from_sorted', 'load'])
+def test_compact_tree_traversals(build, tmp_path):
+    rng = random.Random(7)
+    data = rng.sample(range(1000), 200)
+    if build == 'insert':
+        tree = CompactTree(dtype=np.int64)
+        for item in data:
+            tree.insert(item)
+    else:
+        tree = CompactTree.from_unsorted(data)
+        if build == 'load':
+            tree.save(tmp_path / 'compact.npy')
+            tree = CompactTree.load(tmp_path / 'compact.npy')
+
+    expected = _compact_orders(tree)
+    for order in ['inorder', 'preorder', 'postorder']:
+        assert list(getattr(tree, order)()) == expected[order]
+    levelorder = list(tree.levelorder())
+    assert sorted(levelorder) == list(range(len(tree)))
+    assert tree.keys[levelorder].tolist() == [node.data for node in tree.to_tree().iterative_levelorder()]
+    assert tree.keys[expected['inorder']].tolist() == sorted(data)
+
+
+def test_compact_tree_empty_and_round_trip():
+    empty = CompactTree()
+    for order in ['inorder', 'preorder', 'postorder', 'levelorder']:
+        assert list(getattr(empty, order)()) == []
+    assert empty.to_tree().root is None
+
+    tree = BinaryTree.from_sorted(list(range(20)))
+    compact = CompactTree.from_tree(tree, dtype=np.int64)
+    assert compact.keys[list(compact.levelorder())].tolist() == \
+        [node.data for node in tree.iterative_levelorder()]
+    assert [node.data for node in compact.to_tree().iterative_inorder()] == list(range(20))
+
+
+def _insert_tree(data):
+    tree = BinaryTree(Node(data[0]))
+    for item in data[1:]:
+        tree.insert(Node(item))
+    return tree
+
+
+@pytest.mark.parametrize('build', ['from_sorted', 'insert'])
+def test_binary_search_and_contains(build):
+    rng = random.Random(11)
+    data = rng.sample(range(0, 400, 2), 120)
+    tree = BinaryTree.from_unsorted(data) if build == 'from_sorted' else _insert_tree(data)
+    for value in range(-1, 401):
+        node = tree.binary_search(value)
+        assert (node is not None) == (value in data) == tree.contains(value)
+        assert node is None or node.data == value
+    assert BinaryTree().binary_search(1) is None
+
+
+@pytest.mark.parametrize('build', ['from_sorted', 'insert'])
+def test_search_many_matches_binary_search(build):
+    rng = random.Random(12)
+    data = rng.sample(range(0, 400, 2), 120)
+    tree = BinaryTree.from_unsorted(data) if build == 'from_sorted' else _insert_tree(data)
+
+    queries = sorted(rng.randrange(-5, 405) for _ in range(300))  # hits, misses and repeats
+    nodes = tree.search_many(queries)
+    assert len(nodes) == len(queries)
+    for key, node in zip(queries, nodes):
+        assert node is tree.binary_search(key)
+
+    assert tree.search_many([]) == []
+    assert BinaryTree().search_many([1, 2]) == [None, None]
+
+
+def test_search_many_rejects_unsorted_keys():
+    tree = BinaryTree.from_sorted([10, 14, 19, 27, 31, 35, 42])
+    with pytest.raises(ValueError):
+        tree.search_many([10, 35, 14])
+
+
+def _recursive_orders(node, orders=None):
+    """Reference traversals straight from the recursive definitions"""
+    if orders is None:
+        orders = {'inorder': [], 'rev_inorder': [], 'preorder': [], 'postorder': []}
+    if node is not None:
+        orders['preorder'].append(node.data)
+        _recursive_orders(node.left, orders)
+        orders['inorder'].append(node.data)
+        _recursive_orders(node.right, orders)
+        orders['postorder'].append(node.data)
+    orders['rev_inorder'] = orders['inorder'][::-1]
+    return orders
+
+
+def _random_shape_tree(rng, size):
+    """Any shape, not a search tree, so the traversals can't rely on the ordering"""
+    nodes = [Node(idx) for idx in range(size)]
+    for idx, node in enumerate(nodes[1:], 1):
+        parent = nodes[rng.randrange(idx)]
+        while True:
+            side = rng.choice(['left', 'right'])
+            if getattr(parent, side) is None:
+                setattr(parent, side, node)
+                break
+            parent = getattr(parent, side)
+    return BinaryTree(nodes[0])
+
+
+def _links(tree):
+    return [(node, node.left, node.right) for node in tree.iterative_preorder()]
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 7, 100])
+def test_traversals_match_recursive_definitions(size):
+    tree = _random_shape_tree(random.Random(size), size) if size else BinaryTree()
+    expected = _recursive_orders(tree.root)
+    for method, orders in [('iterative', ['inorder', 'rev_inorder', 'preorder', 'postorder']),
+                           ('recursive', ['inorder', 'rev_inorder', 'preorder', 'postorder']),
+                           ('morris', ['inorder', 'preorder'])]:
+        for order in orders:
+            assert [node.data for node in tree.traverse(order, method)] == expected[order], (method, order)
+
+    levels = [node.data for node in tree.iterative_levelorder()]
+    assert sorted(levels) == list(range(size))
+    with pytest.raises(MethodNotFoundError):
+        tree.traverse('levelorder', 'morris')
+
+
+def test_traversals_of_a_subtree_and_a_deep_chain():
+    tree = BinaryTree.from_sorted(list(range(15)))
+    subtree = tree.root.left
+    assert [node.data for node in tree.iterative_inorder(subtree)] == list(range(7))
+    assert [node.data for node in tree.morris_preorder(subtree)] == _recursive_orders(subtree)['preorder']
+
+    chain = _insert_tree(list(range(5000)))  # degenerate, deeper than the recursion limit
+    assert [node.data for node in chain.iterative_postorder()] == list(range(4999, -1, -1))
+    assert [node.data for node in chain.morris_inorder()] == list(range(5000))
+
+
+@pytest.mark.parametrize('order', ['inorder', 'preorder'])
+def test_morris_stopped_early_restores_links(order):
+    tree = _random_shape_tree(random.Random(13), 60)
+    before = _links(tree)
+    expected = [node.data for node in tree.traverse(order)]
+
+    walk = tree.traverse(order, 'morris')
+    assert [next(walk).data for _ in range(10)] == expected[:10]
+    walk.close()
+    assert _links(tree) == before
+
+    for node in tree.traverse(order, 'morris'):
+        if node.data == expected[30]:
+            break
+    assert _links(tree) == before
+    assert [node.data for node in tree.traverse(order, 'morris')] == expected
+
+
+def _height_and_balance(node):
+    """Returns the height of the subtree, asserting every node's subtrees differ by at most 1"""
+    if node is None:
+        return 0
+    left, right = _height_and_balance(node.left), _height_and_balance(node.right)
+    assert abs(left - right) <= 1
+    return 1 + max(left, right)
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 3, 7, 8, 1000, 2**14 - 1])
+def test_from_sorted_is_balanced(size):
+    items = list(range(size))
+    for tree in (BinaryTree.from_sorted(items), balanced_tree_from_sorted_array(items)):
+        assert _height_and_balance(tree.root) == size.bit_length()
+        assert [node.data for node in tree.iterative_inorder()] == items
+
+
+def test_from_sorted_ndarray_and_range():
+    tree = BinaryTree.from_sorted(np.arange(10))
+    assert [int(node.data) for node in tree.iterative_inorder()] == list(range(10))
+
+    root = balanced_root_from_sorted_array(list(range(10)), start=3, stop=8)
+    assert _recursive_orders(root)['inorder'] == [3, 4, 5, 6, 7]
+    assert root.data == 5
+    assert balanced_root_from_sorted_array([1, 2], start=2) is None
+
+
+def test_from_unsorted_sorts_and_drops_duplicates():
+    rng = random.Random(14)
+    data = [rng.randrange(300) for _ in range(1000)]
+    tree = BinaryTree.from_unsorted(iter(data))
+    unique = sorted(set(data))
+    assert [node.data for node in tree.iterative_inorder()] == unique
+    assert _height_and_balance(tree.root) == len(unique).bit_length()
+    assert all(tree.contains(item) for item in unique)
+    assert BinaryTree.from_unsorted([]).root is None